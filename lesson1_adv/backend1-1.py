@@ -1,93 +1,3046 @@
-from typing import Optional
+import asyncio
+import base64
+import binascii
+import functools
+import heapq
+import inspect
+import json
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from email.utils import formatdate, parsedate_to_datetime
+from itertools import islice
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator, Literal, Optional, Union
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import msgpack  # requirements.txt 에 있음, 없으면 msgpack 형식을 제공하지 않음 (SERIALIZERS)
+except ImportError:
+    msgpack = None
 
 
 class Item(BaseModel):
     name: str
-    price: float
+    price: float = Field(allow_inf_nan=False)  # nan 은 크기 비교가 안 돼서 정렬 인덱스에서 찾을 수도 지울 수도 없음
     in_stock: bool = True
     description: Optional[str] = None
 
 
-class ItemResponse(BaseModel):
-    id: int
-    name: str
-    price: float
-    in_stock: bool
-    description: Optional[str] = None
+class ItemResponse(BaseModel):
+    id: int
+    name: str
+    price: float
+    in_stock: bool
+    description: Optional[str] = None
+    version: int = 0  # 바뀔 때마다 커지는 버전 (VersionClock), ETag 로 사용
+
+
+class ItemUpdate(Item):
+    id: int
+
+
+class BatchResult(BaseModel):
+    """일괄 처리에서 아이템 하나의 결과"""
+    id: int
+    status: int
+    item: Optional[ItemResponse] = None
+    detail: Optional[str] = None
+
+
+class ImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: list[dict]  # {"line": 줄 번호, "detail": 검증 에러}, 최대 IMPORT_MAX_ERRORS 개
+
+
+class User(BaseModel):
+    name: str
+
+
+class UserResponse(User):
+    id: int
+
+
+class OrderLine(BaseModel):
+    item_id: int
+    quantity: int = Field(1, ge=1)
+
+
+class Order(BaseModel):
+    lines: list[OrderLine] = Field(min_length=1)
+
+
+class OrderLineResponse(OrderLine):
+    price: float  # 주문할 때의 가격 (나중에 아이템 가격이 바뀌어도 그대로)
+    item: Optional[ItemResponse] = None  # 지금의 아이템, 삭제됐으면 None
+
+
+class OrderResponse(BaseModel):
+    id: int
+    user_id: int
+    total: float
+    lines: list[OrderLineResponse]
+
+
+class ItemIndex:
+    """정렬/필터용 보조 인덱스 - 생성, 수정, 삭제 때마다 함께 갱신"""
+
+    SORT_FIELDS = ("id", "price")
+
+    def __init__(self) -> None:
+        # (정렬 필드, in_stock 필터) -> 정렬된 [(정렬키, id), ...] 리스트
+        # in_stock 필터가 None 이면 전체, True/False 면 재고 여부로 나눈 부분집합
+        self.sorted_keys: dict[tuple[str, Optional[bool]], list[tuple[float, int]]] = {
+            (field, in_stock): [] for field in self.SORT_FIELDS for in_stock in (None, True, False)
+        }
+
+    def _entries(self, _item: "ItemResponse"):
+        for field in self.SORT_FIELDS:
+            key = (getattr(_item, field), _item.id)
+
+            yield self.sorted_keys[(field, None)], key
+            yield self.sorted_keys[(field, _item.in_stock)], key
+
+    def add(self, _item: "ItemResponse") -> None:
+        """아이템을 인덱스에 추가, 이진 탐색으로 자리를 찾음 O(log n)"""
+        for keys, key in self._entries(_item):
+            if not keys or keys[-1] < key:  # 새 id 처럼 맨 뒤에 붙는 경우가 가장 흔함
+                keys.append(key)
+            else:
+                insort(keys, key)
+
+    def remove(self, _item: "ItemResponse") -> None:
+        """아이템을 인덱스에서 제거"""
+        for keys, key in self._entries(_item):
+            pos = bisect_left(keys, key)
+
+            if pos < len(keys) and keys[pos] == key:
+                del keys[pos]
+
+    def build(self, _items) -> None:
+        """전체 아이템으로 인덱스를 한번에 만들기, 하나씩 insort 하는것보다 훨씬 빠름 O(n log n)"""
+        for keys in self.sorted_keys.values():
+            keys.clear()
+
+        for item in _items:
+            for keys, key in self._entries(item):
+                keys.append(key)
+
+        for keys in self.sorted_keys.values():
+            keys.sort()
+
+    def page(self, _sort: str, _order: str, _in_stock: Optional[bool], _offset: int, _limit: Optional[int]) -> list[int]:
+        """정렬/필터가 적용된 한 페이지의 id 목록, 전체를 훑지 않고 필요한 구간만 잘라냄"""
+        keys = self.sorted_keys[(_sort, _in_stock)]
+        end = len(keys) if _limit is None else _offset + _limit
+
+        if _order == "asc":
+            return [item_id for _, item_id in keys[_offset:end]]
+
+        # 내림차순은 리스트의 뒤에서부터 잘라서 뒤집기
+        n = len(keys)
+        window = keys[max(n - end, 0):max(n - _offset, 0)]
+
+        return [item_id for _, item_id in reversed(window)]
+
+    def page_after(self, _sort: str, _order: str, _in_stock: Optional[bool], _after: tuple, _limit: Optional[int]) -> list[int]:
+        """(정렬키, id) 가 _after 인 아이템 바로 다음부터 _limit 개(None 이면 끝까지)의 id 목록, 이진 탐색으로 시작 위치를 찾음"""
+        keys = self.sorted_keys[(_sort, _in_stock)]
+
+        if _order == "asc":
+            start = bisect_right(keys, _after)
+
+            return [item_id for _, item_id in keys[start:None if _limit is None else start + _limit]]
+
+        end = bisect_left(keys, _after)
+
+        return [item_id for _, item_id in reversed(keys[0 if _limit is None else max(end - _limit, 0):end])]
+
+
+class VersionClock:
+    """단조 증가하는 버전 번호 발급기
+
+    현재 시각(마이크로초)을 쓰되 항상 이전 값보다 1 이상 크게 만듦
+    그래서 버전끼리 크기 비교가 되면서 동시에 마지막 수정 시각(Last-Modified)도 알 수 있음
+    """
+
+    def __init__(self) -> None:
+        self.last = 0
+        self.lock = threading.Lock()
+
+    def next(self) -> int:
+        with self.lock:
+            self.last = max(self.last + 1, time.time_ns() // 1000)
+
+            return self.last
+
+
+class PreconditionFailed(Exception):
+    """If-Match 로 보낸 버전이 지금 버전과 다름 (그 사이에 누군가 수정함)"""
+
+
+class ItemTooLarge(Exception):
+    """고정 크기 칸에 저장하는 저장소(SharedStore)에 들어가지 않는 아이템"""
+
+
+class StoreEvents:
+    """저장소 변경 알림 - 아이템이 바뀔 때마다 등록된 함수를 (이전 아이템, 새 아이템) 으로 호출
+
+    추가는 (None, 새것), 삭제는 (이전것, None). 캐시, 검색 인덱스처럼
+    저장소에서 파생된 데이터를 모든 저장소와 모든 핸들러에서 똑같이 갱신하기 위해 사용
+    """
+
+    def __init__(self) -> None:
+        self.listeners: list[Callable[[Optional[ItemResponse], Optional[ItemResponse]], None]] = []
+
+    def subscribe(self, _listener: Callable[[Optional[ItemResponse], Optional[ItemResponse]], None]) -> None:
+        self.listeners.append(_listener)
+
+    def _notify(self, _old: Optional[ItemResponse], _new: Optional[ItemResponse]) -> None:
+        for listener in self.listeners:
+            listener(_old, _new)
+
+
+class MemoryStore(StoreEvents):
+    """기본 저장소 - 메모리의 딕셔너리, 서버를 끄면 모두 사라짐"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.items: dict[int, ItemResponse] = {}
+        self.index = ItemIndex()
+        self.next_id = 1
+        self.lock = threading.RLock()  # def 핸들러는 스레드풀에서 동시에 실행되기 때문에 필요
+        self.clock = VersionClock()
+        self.version = self.clock.next()  # 전체 목록의 버전, 서버를 켤 때마다 새로 시작해서 이전 ETag 는 모두 무효
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, _item_id: int) -> bool:
+        return _item_id in self.items
+
+    def get(self, _item_id: int) -> Optional[ItemResponse]:
+        return self.items.get(_item_id)
+
+    def get_many(self, _item_ids) -> dict[int, ItemResponse]:
+        """여러 아이템을 한번에, 없는 id 는 결과에서 빠짐"""
+        with self.lock:
+            return {item_id: self.items[item_id] for item_id in _item_ids if item_id in self.items}
+
+    def values(self):
+        return self.items.values()
+
+    def page(self, _sort: str, _order: str, _in_stock: Optional[bool], _offset: int, _limit: Optional[int]) -> list[ItemResponse]:
+        with self.lock:
+            item_ids = self.index.page(_sort, _order, _in_stock, _offset, _limit)
+
+            return [self.items[item_id] for item_id in item_ids]
+
+    def page_after(self, _sort: str, _order: str, _in_stock: Optional[bool], _after: tuple, _limit: Optional[int]) -> list[ItemResponse]:
+        with self.lock:
+            item_ids = self.index.page_after(_sort, _order, _in_stock, _after, _limit)
+
+            return [self.items[item_id] for item_id in item_ids]
+
+    def create(self, _item: Item) -> ItemResponse:
+        data = _item.model_dump()
+
+        with self.lock:
+            new_item = ItemResponse(id=self.next_id, version=self.clock.next(), **data)
+            self._apply_put(new_item)
+            self._write_put(new_item)
+
+        return new_item
+
+    def create_many(self, _items: list[Item]) -> list[ItemResponse]:
+        """여러 아이템을 한번에 추가, id 는 연속된 블록으로 한번에 할당"""
+        datas = [item.model_dump() for item in _items]
+
+        with self.lock:
+            first_id = self.next_id
+            new_items = [ItemResponse(id=first_id + i, version=self.clock.next(), **data) for i, data in enumerate(datas)]
+
+            for new_item in new_items:
+                self._apply_put(new_item)
+                self._write_put(new_item)
+
+        return new_items
+
+    def update(self, _item_id: int, _item: Item, _if_match: Optional[set[int]] = None) -> Optional[ItemResponse]:
+        """없는 아이템이면 None, _if_match 가 있는데 지금 버전이 그 안에 없으면 PreconditionFailed"""
+        data = _item.model_dump()
+
+        with self.lock:
+            self._check_version(_item_id, _if_match)
+
+            if _item_id not in self.items:
+                return None
+
+            updated = ItemResponse(id=_item_id, version=self.clock.next(), **data)
+            self._apply_put(updated)
+            self._write_put(updated)
+
+        return updated
+
+    def delete(self, _item_id: int, _if_match: Optional[set[int]] = None) -> Optional[ItemResponse]:
+        """삭제된 아이템을 반환, 없는 아이템이면 None"""
+        with self.lock:
+            self._check_version(_item_id, _if_match)
+            removed = self._apply_delete(_item_id)
+
+            if removed is not None:
+                self._write_delete(_item_id)
+
+        return removed
+
+    def update_many(self, _updates: list[tuple[int, Item]]) -> list[Optional[ItemResponse]]:
+        """여러 아이템을 한번에 수정, 없는 아이템 자리는 None"""
+        datas = [(item_id, item.model_dump()) for item_id, item in _updates]
+        results: list[Optional[ItemResponse]] = []
+
+        with self.lock:
+            for item_id, data in datas:
+                if item_id not in self.items:
+                    results.append(None)
+
+                    continue
+
+                updated = ItemResponse(id=item_id, version=self.clock.next(), **data)
+                self._apply_put(updated)
+                self._write_put(updated)
+                results.append(updated)
+
+        return results
+
+    def delete_many(self, _item_ids: list[int]) -> list[Optional[ItemResponse]]:
+        """여러 아이템을 한번에 삭제, 없는 아이템 자리는 None"""
+        results: list[Optional[ItemResponse]] = []
+
+        with self.lock:
+            for item_id in _item_ids:
+                removed = self._apply_delete(item_id)
+
+                if removed is not None:
+                    self._write_delete(item_id)
+
+                results.append(removed)
+
+        return results
+
+    def refresh(self) -> None:
+        """다른 프로세스의 변경을 반영, 한 프로세스 안에서만 쓰는 저장소라 할 일 없음"""
+
+    def seed(self, _items: list[Item]) -> None:
+        """한번도 쓴 적 없는 저장소에만 예시 데이터 넣기"""
+        with self.lock:
+            if self.next_id == 1:
+                self.create_many(_items)
+
+    def close(self) -> None:
+        pass
+
+    def _check_version(self, _item_id: int, _if_match: Optional[set[int]]) -> None:
+        item = self.items.get(_item_id)
+
+        if _if_match is not None and item is not None and item.version not in _if_match:
+            raise PreconditionFailed(_item_id)
+
+    def _apply_put(self, _item: ItemResponse) -> None:
+        old = self.items.get(_item.id)
+
+        if old is not None:
+            self.index.remove(old)
+
+        self.items[_item.id] = _item
+        self.index.add(_item)
+        self.next_id = max(self.next_id, _item.id + 1)
+        self.version = _item.version
+        self._notify(old, _item)  # 락을 잡은 채로 알려서 변경 순서와 알림 순서가 같음
+
+    def _apply_delete(self, _item_id: int) -> Optional[ItemResponse]:
+        removed = self.items.pop(_item_id, None)
+
+        if removed is not None:
+            self.index.remove(removed)
+            self.version = self.clock.next()
+            self._notify(removed, None)
+
+        return removed
+
+    # 아래 두 함수는 디스크에 저장하는 저장소가 덮어써서(override) 사용
+    def _write_put(self, _item: ItemResponse) -> None:
+        pass
+
+    def _write_delete(self, _item_id: int) -> None:
+        pass
+
+
+class LogStore(MemoryStore):
+    """추가 전용 로그(append-only log) + 스냅샷으로 디스크에 저장하는 저장소
+
+    - 쓰기는 메모리에 반영한 뒤 로그 파일 끝에 "put\t{json}" 또는 "del\t{id}" 한 줄 추가만 함
+      (메모리 딕셔너리와 거의 같은 속도)
+    - fsync 는 flush_interval 초마다, 또는 flush_every 개가 쌓이면 모아서 한번에 (그룹 커밋)
+      그래서 전원이 나가면 마지막 flush_interval 동안의 쓰기는 잃을 수 있음
+    - 로그가 compact_every 줄을 넘으면 전체를 스냅샷으로 저장하고 지난 로그는 지움
+    - 시작할 때 스냅샷을 읽고, 그 뒤에 쌓인 로그만 다시 실행(replay)
+    """
+
+    SNAPSHOT_NAME = "snapshot.jsonl"
+
+    def __init__(self, _path: str, _flush_interval: float = 0.05, _flush_every: int = 1000, _compact_every: int = 100_000) -> None:
+        super().__init__()
+        self.path = Path(_path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = _flush_interval
+        self.flush_every = _flush_every
+        self.compact_every = _compact_every
+
+        self.pending = 0      # 아직 fsync 되지 않은 레코드 수
+        self.log_records = 0  # 마지막 스냅샷 이후 로그에 쌓인 레코드 수
+        self.gen = self._recover()
+        self.log = self._open_log(self.gen)
+
+        self.closed = False
+        self.sync_lock = threading.Lock()  # fsync 도중에 로그 파일이 바뀌지 않도록
+        self.compacting: Optional[threading.Thread] = None
+        self.wake = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flusher.start()
+
+    def close(self) -> None:
+        """남은 로그를 디스크에 기록하고 파일 닫기"""
+        if self.closed:
+            return
+
+        self.closed = True
+        self.wake.set()
+        self.flusher.join()
+
+        compacting = self.compacting  # 스냅샷 스레드가 끝나면서 None 으로 바꿀 수 있어서 먼저 꺼내두기
+
+        if compacting is not None:
+            compacting.join()
+
+        self.sync()
+        self.log.close()
+
+    def sync(self) -> None:
+        """버퍼에 쌓인 로그를 한번에 fsync (그룹 커밋)"""
+        with self.sync_lock:
+            with self.lock:
+                if self.pending == 0:
+                    return
+
+                self.log.flush()
+                self.pending = 0
+                fd = self.log.fileno()
+
+            os.fsync(fd)  # 느린 fsync 는 self.lock 밖에서, 그동안 다른 쓰기는 계속 진행됨
+
+    def compact(self) -> None:
+        """새 로그 파일로 갈아타고, 지금까지의 내용은 백그라운드에서 스냅샷으로 저장"""
+        with self.sync_lock:
+            with self.lock:
+                self.log.flush()
+                old_log = self.log
+                self.pending = 0
+
+                items = list(self.items.values())
+                next_id = self.next_id
+                done_gen = self.gen
+
+                self.gen += 1
+                self.log = self._open_log(self.gen)
+                self.log_records = 0
+
+            # sync 와 같이 느린 fsync 는 self.lock 밖에서, 새 쓰기는 이미 새 로그 파일로 감
+            os.fsync(old_log.fileno())
+            old_log.close()
+
+        self.compacting = threading.Thread(target=self._write_snapshot, args=(done_gen, next_id, items), daemon=True)
+        self.compacting.start()
+
+    def _flush_loop(self) -> None:
+        while not self.closed:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.sync()
+
+            if self.log_records >= self.compact_every and self.compacting is None:
+                self.compact()
+
+    def _log_path(self, _gen: int) -> Path:
+        return self.path / f"items-{_gen:06d}.log"
+
+    def _open_log(self, _gen: int):
+        return open(self._log_path(_gen), "a", encoding="utf-8")
+
+    def _append(self, _line: str) -> None:
+        self.log.write(_line)
+        self.pending += 1
+        self.log_records += 1
+
+        if self.pending >= self.flush_every:
+            self.wake.set()
+
+    def _write_put(self, _item: ItemResponse) -> None:
+        self._append(f"put\t{_item.model_dump_json()}\n")
+
+    def _write_delete(self, _item_id: int) -> None:
+        self._append(f"del\t{_item_id}\n")
+
+    def _write_snapshot(self, _gen: int, _next_id: int, _items: list[ItemResponse]) -> None:
+        tmp = self.path / (self.SNAPSHOT_NAME + ".tmp")
+
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"gen": _gen, "next_id": _next_id}) + "\n")
+
+            for item in _items:
+                f.write(item.model_dump_json() + "\n")
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, self.path / self.SNAPSHOT_NAME)  # 다 쓴 뒤에 한번에 교체, 도중에 꺼져도 이전 스냅샷은 안전
+
+        for gen in self._log_gens():
+            if gen <= _gen:
+                self._log_path(gen).unlink(missing_ok=True)
+
+        self.compacting = None
+
+    def _log_gens(self) -> list[int]:
+        return sorted(int(p.stem.split("-")[1]) for p in self.path.glob("items-*.log"))
+
+    def _recover(self) -> int:
+        """스냅샷 + 로그로 메모리 상태를 복구하고, 새로 쓸 로그 번호를 반환"""
+        snapshot_gen = -1
+        snapshot = self.path / self.SNAPSHOT_NAME
+
+        if snapshot.exists():
+            with open(snapshot, encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                snapshot_gen = header["gen"]
+                self.next_id = header["next_id"]
+
+                for line in f:
+                    item = ItemResponse.model_validate_json(line)
+                    self.items[item.id] = item
+
+        gens = self._log_gens()
+
+        for gen in gens:
+            if gen > snapshot_gen:
+                self.log_records += self._replay(gen)
+
+        # 인덱스는 복구가 끝난 뒤 한번에 만들기
+        self.index.build(self.items.values())
+
+        # 시계가 뒤로 가 있더라도 저장된 버전보다는 항상 큰 버전을 발급하도록
+        self.clock.last = max((item.version for item in self.items.values()), default=0)
+        self.version = self.clock.next()
+
+        return max(gens + [snapshot_gen]) + 1
+
+    def _replay(self, _gen: int) -> int:
+        count = 0
+
+        with open(self._log_path(_gen), encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # 마지막 줄을 쓰던 도중에 꺼진 경우
+
+                op, data = line.split("\t", 1)
+
+                if op == "put":
+                    item = ItemResponse.model_validate_json(data)
+                    self.items[item.id] = item
+                    self.next_id = max(self.next_id, item.id + 1)
+                else:
+                    self.items.pop(int(data), None)
+
+                count += 1
+
+        return count
+
+
+class SqliteConnections:
+    """SQLite 파일 하나에 스레드마다 자기 연결(connection)을 하나씩 만들어 재사용 (threading.local)
+
+    스레드풀의 여러 스레드가 하나의 연결을 기다리지 않고 동시에 읽을 수 있음
+    WAL 모드라서 쓰는 도중에도 다른 스레드(다른 프로세스)의 읽기가 막히지 않음
+    """
+
+    def __init__(self, _path: str) -> None:
+        Path(_path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = _path
+        self.local = threading.local()
+        self.connections: list[sqlite3.Connection] = []
+        self.connections_lock = threading.Lock()
+        self._conn().execute("PRAGMA journal_mode=WAL")
+
+    def _conn(self) -> sqlite3.Connection:
+        """지금 스레드의 연결, 처음 쓰는 스레드면 새로 만들어서 풀에 등록"""
+        conn = getattr(self.local, "conn", None)
+
+        if conn is None:
+            # isolation_level=None: 문장 하나하나가 바로 커밋됨
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, cached_statements=64)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self.local.conn = conn
+
+            with self.connections_lock:
+                self.connections.append(conn)
+
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ~ COMMIT, 여러 문장을 한번의 커밋(한번의 디스크 쓰기)으로 묶기"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # 처음부터 쓰기 락을 잡아서 다른 쓰기와 섞이지 않게
+
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self.connections_lock:
+            for conn in self.connections:
+                conn.close()
+
+            self.connections.clear()
+
+        self.local = threading.local()
+
+
+class SqliteStore(StoreEvents, SqliteConnections):
+    """SQLite 저장소 - MemoryStore 와 같은 함수들을 제공해서 바꿔 끼울 수 있음
+
+    - 연결은 스레드마다 하나씩, WAL 모드 (SqliteConnections)
+    - SQL 문은 미리 정해둔 문자열만 사용 -> 연결마다 한번만 준비(prepare)되고 캐시에서 재사용
+    - price, in_stock 에 인덱스를 만들어 필터/정렬된 페이지를 인덱스로 바로 찾음
+    """
+
+    COLUMNS = "id, name, price, in_stock, description, version"
+    GET_MANY_CHUNK = 500
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS items ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, price REAL NOT NULL, "
+        "in_stock INTEGER NOT NULL, description TEXT, version INTEGER NOT NULL DEFAULT 0)",
+        "CREATE INDEX IF NOT EXISTS ix_items_price ON items (price, id)",
+        "CREATE INDEX IF NOT EXISTS ix_items_stock_id ON items (in_stock, id)",
+        "CREATE INDEX IF NOT EXISTS ix_items_stock_price ON items (in_stock, price, id)",
+    ]
+
+    def __init__(self, _path: str) -> None:
+        StoreEvents.__init__(self)
+        SqliteConnections.__init__(self, _path)
+        conn = self._conn()
+
+        for sql in self.SCHEMA:
+            conn.execute(sql)
+
+        # version 컬럼이 없던 예전 DB 파일이면 추가
+        if "version" not in [row[1] for row in conn.execute("PRAGMA table_info(items)")]:
+            conn.execute("ALTER TABLE items ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+        self.clock = VersionClock()
+        self.clock.last = conn.execute("SELECT COALESCE(MAX(version), 0) FROM items").fetchone()[0]
+        self.version = self.clock.next()
+        self.version_lock = threading.Lock()
+
+        # 정렬/필터 조합별 SELECT 문을 미리 만들어두기 (ORDER BY 는 ? 로 넘길 수 없어서)
+        # page_after_sql 은 (정렬키, id) 다음부터 읽는 문장, OFFSET 없이 인덱스에서 바로 시작 위치를 찾음
+        self.page_sql: dict[tuple[str, str, bool], str] = {}
+        self.page_after_sql: dict[tuple[str, str, bool], str] = {}
+
+        for sort in ItemIndex.SORT_FIELDS:
+            for order in ("asc", "desc"):
+                for filtered in (False, True):
+                    stock_cond = "in_stock = ? AND " if filtered else ""
+                    cmp = ">" if order == "asc" else "<"
+                    after = f"id {cmp} ?" if sort == "id" else f"({sort}, id) {cmp} (?, ?)"
+                    order_by = f"{sort} {order}" if sort == "id" else f"{sort} {order}, id {order}"
+
+                    self.page_sql[(sort, order, filtered)] = (
+                        f"SELECT {self.COLUMNS} FROM items {'WHERE in_stock = ? ' if filtered else ''}"
+                        f"ORDER BY {order_by} LIMIT ? OFFSET ?"
+                    )
+                    self.page_after_sql[(sort, order, filtered)] = (
+                        f"SELECT {self.COLUMNS} FROM items WHERE {stock_cond}{after} ORDER BY {order_by} LIMIT ?"
+                    )
+
+    @staticmethod
+    def _to_item(_row) -> ItemResponse:
+        return ItemResponse(
+            id=_row[0], name=_row[1], price=_row[2], in_stock=bool(_row[3]), description=_row[4], version=_row[5]
+        )
+
+    def _publish(self) -> None:
+        """커밋이 끝난 뒤에 전체 목록의 버전 올리기
+
+        버전을 먼저 올리고 커밋하면, 그 사이에 읽은 요청이 옛날 데이터에 새 버전(ETag)을 붙일 수 있음
+        """
+        with self.version_lock:
+            self.version = self.clock.next()
+
+    @property
+    def next_id(self) -> int:
+        row = self._conn().execute("SELECT seq FROM sqlite_sequence WHERE name = 'items'").fetchone()
+
+        return 1 if row is None else row[0] + 1
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def __contains__(self, _item_id: int) -> bool:
+        return self.get(_item_id) is not None
+
+    def get(self, _item_id: int) -> Optional[ItemResponse]:
+        row = self._conn().execute(f"SELECT {self.COLUMNS} FROM items WHERE id = ?", (_item_id,)).fetchone()
+
+        return None if row is None else self._to_item(row)
+
+    def get_many(self, _item_ids) -> dict[int, ItemResponse]:
+        """id 마다 쿼리하지 않고 IN (...) 한 번으로, SQLite 의 변수 개수 제한 때문에 GET_MANY_CHUNK 개씩"""
+        item_ids = list(dict.fromkeys(_item_ids))
+        items = {}
+
+        for start in range(0, len(item_ids), self.GET_MANY_CHUNK):
+            chunk = item_ids[start:start + self.GET_MANY_CHUNK]
+            sql = f"SELECT {self.COLUMNS} FROM items WHERE id IN ({', '.join('?' * len(chunk))})"
+
+            for row in self._conn().execute(sql, chunk):
+                items[row[0]] = self._to_item(row)
+
+        return items
+
+    def values(self):
+        """전체 아이템을 id 순서로 하나씩 꺼내기 (한번에 메모리에 올리지 않음)"""
+        for row in self._conn().execute(f"SELECT {self.COLUMNS} FROM items ORDER BY id"):
+            yield self._to_item(row)
+
+    def page(self, _sort: str, _order: str, _in_stock: Optional[bool], _offset: int, _limit: Optional[int]) -> list[ItemResponse]:
+        sql = self.page_sql[(_sort, _order, _in_stock is not None)]
+        params = (() if _in_stock is None else (int(_in_stock),)) + (-1 if _limit is None else _limit, _offset)
+
+        return [self._to_item(row) for row in self._conn().execute(sql, params)]
+
+    def page_after(self, _sort: str, _order: str, _in_stock: Optional[bool], _after: tuple, _limit: Optional[int]) -> list[ItemResponse]:
+        sql = self.page_after_sql[(_sort, _order, _in_stock is not None)]
+        after = _after[1:] if _sort == "id" else _after
+        params = (() if _in_stock is None else (int(_in_stock),)) + after + (-1 if _limit is None else _limit,)  # LIMIT -1: 끝까지
+
+        return [self._to_item(row) for row in self._conn().execute(sql, params)]
+
+    def create(self, _item: Item) -> ItemResponse:
+        version = self.clock.next()
+        cur = self._conn().execute(
+            "INSERT INTO items (name, price, in_stock, description, version) VALUES (?, ?, ?, ?, ?)",
+            (_item.name, _item.price, int(_item.in_stock), _item.description, version),
+        )
+        new_item = ItemResponse(id=cur.lastrowid, version=version, **_item.model_dump())
+        self._publish()
+        self._notify(None, new_item)
+
+        return new_item
+
+    def create_many(self, _items: list[Item]) -> list[ItemResponse]:
+        with self._transaction() as conn:
+            first_id = self.next_id  # 쓰기 락을 잡은 상태라 이 뒤의 id 블록은 우리 것
+            new_items = [
+                ItemResponse(id=first_id + i, version=self.clock.next(), **item.model_dump())
+                for i, item in enumerate(_items)
+            ]
+            conn.executemany(
+                "INSERT INTO items (id, name, price, in_stock, description, version) VALUES (?, ?, ?, ?, ?, ?)",
+                [(item.id, item.name, item.price, int(item.in_stock), item.description, item.version) for item in new_items],
+            )
+
+        self._publish()
+
+        for new_item in new_items:
+            self._notify(None, new_item)
+
+        return new_items
+
+    def update(self, _item_id: int, _item: Item, _if_match: Optional[set[int]] = None) -> Optional[ItemResponse]:
+        return self._update_rows([(_item_id, _item)], _if_match)[0]
+
+    def delete(self, _item_id: int, _if_match: Optional[set[int]] = None) -> Optional[ItemResponse]:
+        return self._delete_rows([_item_id], _if_match)[0]
+
+    def update_many(self, _updates: list[tuple[int, Item]]) -> list[Optional[ItemResponse]]:
+        return self._update_rows(_updates, None)
+
+    def delete_many(self, _item_ids: list[int]) -> list[Optional[ItemResponse]]:
+        return self._delete_rows(_item_ids, None)
+
+    def _update_rows(self, _updates: list[tuple[int, Item]], _if_match: Optional[set[int]]) -> list[Optional[ItemResponse]]:
+        changes = []
+
+        with self._transaction() as conn:
+            for item_id, item in _updates:
+                # 변경 알림과 If-Match 비교에 이전 값이 필요해서 같은 트랜잭션 안에서 먼저 읽기
+                old = conn.execute(f"SELECT {self.COLUMNS} FROM items WHERE id = ?", (item_id,)).fetchone()
+
+                if old is None:
+                    changes.append((None, None))
+
+                    continue
+
+                if _if_match is not None and old[5] not in _if_match:
+                    raise PreconditionFailed(item_id)  # _transaction 이 ROLLBACK 함
+
+                updated = ItemResponse(id=item_id, version=self.clock.next(), **item.model_dump())
+                conn.execute(
+                    "UPDATE items SET name = ?, price = ?, in_stock = ?, description = ?, version = ? WHERE id = ?",
+                    (item.name, item.price, int(item.in_stock), item.description, updated.version, item_id),
+                )
+                changes.append((self._to_item(old), updated))
+
+        # 커밋이 끝난 뒤에 알려야 캐시가 커밋 전의 옛날 값을 다시 담지 않음
+        self._publish()
+
+        for old, updated in changes:
+            if updated is not None:
+                self._notify(old, updated)
+
+        return [updated for _, updated in changes]
+
+    def _delete_rows(self, _item_ids: list[int], _if_match: Optional[set[int]]) -> list[Optional[ItemResponse]]:
+        with self._transaction() as conn:
+            rows = []
+
+            for item_id in _item_ids:
+                # RETURNING 은 SQLite 3.35 이상
+                row = conn.execute(f"DELETE FROM items WHERE id = ? RETURNING {self.COLUMNS}", (item_id,)).fetchone()
+
+                if row is not None and _if_match is not None and row[5] not in _if_match:
+                    raise PreconditionFailed(item_id)
+
+                rows.append(row)
+
+        removed = [None if row is None else self._to_item(row) for row in rows]
+        self._publish()
+
+        for item in removed:
+            if item is not None:
+                self._notify(item, None)
+
+        return removed
+
+    def refresh(self) -> None:
+        """매번 DB 에서 읽기 때문에 할 일 없음"""
+
+    def seed(self, _items: list[Item]) -> None:
+        if self.next_id == 1:
+            self.create_many(_items)
+
+
+class SharedStore(MemoryStore):
+    """여러 uvicorn 워커 프로세스가 같이 쓰는 저장소 - 파일을 mmap 으로 메모리에 올려서 공유
+
+    파일 구조: [헤더 + 변경 기록(journal)] [아이템 칸 0] [아이템 칸 1] ...
+    - 아이템 id 가 n 이면 n-1 번 칸에 저장 (칸 크기는 SLOT_SIZE 로 고정, 모자라면 파일을 2배로 늘림)
+    - 쓸 때마다 헤더의 seq 를 1 올리고 바뀐 id 를 journal[(seq-1) % JOURNAL_SIZE] 에 기록
+    - 각 프로세스는 MemoryStore 를 그대로 로컬 사본(+인덱스)으로 가지고,
+      헤더의 seq 가 마지막으로 본 값과 다를 때만 journal 을 따라 바뀐 칸만 다시 읽어옴
+      그래서 바뀐게 없으면 읽기는 락 없이 각자의 메모리에서 바로 처리 (워커 수만큼 읽기 처리량이 늘어남)
+    - 프로세스 사이의 락은 fcntl.flock (쓰기는 배타 락, 따라잡기는 공유 락), 그래서 리눅스/macOS 전용
+    - id 와 버전(VersionClock)도 헤더에 두어서 모든 워커가 같은 순서로 발급
+    """
+
+    MAGIC = b"ITM1"
+    HEADER = struct.Struct("<4sxxxxQQQQ")    # magic, 칸 수(capacity), next_id, seq, 마지막 버전
+    JOURNAL_SIZE = 8184                      # 헤더(64) + journal(8184 * 8) = 65536, 칸 영역이 mmap 단위에 맞게
+    REGION = 64 + JOURNAL_SIZE * 8
+    SLOT = struct.Struct("<BBxxxxxxdqHH")    # 사용중, in_stock, price, version, 이름 길이, 설명 길이
+    SLOT_SIZE = 512
+    TEXT_SIZE = SLOT_SIZE - SLOT.size        # 이름 + 설명(UTF-8) 에 쓸 수 있는 바이트 수
+    NO_DESCRIPTION = 0xFFFF
+
+    def __init__(self, _path: str, _capacity: int = 100_000) -> None:
+        import fcntl  # 윈도우에는 없어서 이 저장소를 쓸 때만 불러오기
+
+        super().__init__()
+        self.fcntl = fcntl
+        Path(_path).parent.mkdir(parents=True, exist_ok=True)
+        self.fd = os.open(_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.lock_depth = 0
+
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+        try:
+            if os.fstat(self.fd).st_size < self.REGION:  # 새 파일이면 헤더 만들기
+                os.ftruncate(self.fd, self.REGION + _capacity * self.SLOT_SIZE)
+                os.pwrite(self.fd, self.HEADER.pack(self.MAGIC, _capacity, 1, 0, 0), 0)
+
+            self.region = mmap.mmap(self.fd, self.REGION)
+
+            if self._header()[0] != self.MAGIC:
+                raise ValueError(f"{_path} 는 SharedStore 파일이 아닙니다")
+
+            self.capacity = 0
+            self.slots: Optional[mmap.mmap] = None
+            self._rescan()
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _header(self) -> tuple:
+        return self.HEADER.unpack_from(self.region, 0)
+
+    def _write_header(self, _capacity: int, _seq: int) -> None:
+        self.HEADER.pack_into(self.region, 0, self.MAGIC, _capacity, self.next_id, _seq, self.clock.last)
+
+    def _map_slots(self, _capacity: int) -> None:
+        if self.slots is not None:
+            self.slots.close()
+
+        self.capacity = _capacity
+        self.slots = mmap.mmap(self.fd, _capacity * self.SLOT_SIZE, offset=self.REGION)
+
+    # --- 읽기: 다른 워커가 바꾼게 있을 때만 따라잡고 나머지는 MemoryStore 그대로 ---
+
+    def refresh(self) -> None:
+        """다른 워커의 변경을 따라잡기"""
+        if self._header()[3] == self.seq:  # 락 없이 seq 만 비교
+            return
+
+        with self.lock:
+            self.fcntl.flock(self.fd, self.fcntl.LOCK_SH)
+
+            try:
+                self._catch_up()
+            finally:
+                self.fcntl.flock(self.fd, self.fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        self.refresh()
+
+        return super().__len__()
+
+    def __contains__(self, _item_id: int) -> bool:
+        self.refresh()
+
+        return super().__contains__(_item_id)
+
+    def get(self, _item_id: int) -> Optional[ItemResponse]:
+        self.refresh()
+
+        return super().get(_item_id)
+
+    def get_many(self, _item_ids) -> dict[int, ItemResponse]:
+        self.refresh()
+
+        return super().get_many(_item_ids)
+
+    def values(self):
+        self.refresh()
+
+        return super().values()
+
+    def page(self, *_args) -> list[ItemResponse]:
+        self.refresh()
+
+        return super().page(*_args)
+
+    def page_after(self, *_args) -> list[ItemResponse]:
+        self.refresh()
+
+        return super().page_after(*_args)
+
+    # --- 쓰기: 파일 배타 락을 잡고 최신 상태로 따라잡은 뒤 MemoryStore 의 함수를 그대로 사용 ---
+
+    @contextmanager
+    def _exclusive(self):
+        with self.lock:
+            self.lock_depth += 1
+
+            try:
+                if self.lock_depth == 1:
+                    self.fcntl.flock(self.fd, self.fcntl.LOCK_EX)
+                    self._catch_up()
+
+                yield
+            finally:
+                self.lock_depth -= 1
+
+                if self.lock_depth == 0:
+                    self.fcntl.flock(self.fd, self.fcntl.LOCK_UN)
+
+    def create(self, _item: Item) -> ItemResponse:
+        self._check_size(_item)
+
+        with self._exclusive():
+            return super().create(_item)
+
+    def create_many(self, _items: list[Item]) -> list[ItemResponse]:
+        for item in _items:
+            self._check_size(item)
+
+        with self._exclusive():
+            return super().create_many(_items)
+
+    def update(self, _item_id: int, _item: Item, _if_match: Optional[set[int]] = None) -> Optional[ItemResponse]:
+        self._check_size(_item)
+
+        with self._exclusive():
+            return super().update(_item_id, _item, _if_match)
+
+    def update_many(self, _updates: list[tuple[int, Item]]) -> list[Optional[ItemResponse]]:
+        for _, item in _updates:
+            self._check_size(item)
+
+        with self._exclusive():
+            return super().update_many(_updates)
+
+    def delete(self, _item_id: int, _if_match: Optional[set[int]] = None) -> Optional[ItemResponse]:
+        with self._exclusive():
+            return super().delete(_item_id, _if_match)
+
+    def delete_many(self, _item_ids: list[int]) -> list[Optional[ItemResponse]]:
+        with self._exclusive():
+            return super().delete_many(_item_ids)
+
+    def seed(self, _items: list[Item]) -> None:
+        with self._exclusive():  # 여러 워커가 동시에 켜져도 한번만 들어가게
+            super().seed(_items)
+
+    def close(self) -> None:
+        self.slots.close()
+        self.region.close()
+        os.close(self.fd)
+
+    def _check_size(self, _item: Item) -> None:
+        # 로컬 사본을 바꾸기 전에 미리 확인해야 파일과 사본이 어긋나지 않음
+        size = len(_item.name.encode()) + len((_item.description or "").encode())
+
+        if size > self.TEXT_SIZE:
+            raise ItemTooLarge(f"이름과 설명은 합쳐서 {self.TEXT_SIZE} 바이트(UTF-8)까지 저장할 수 있습니다")
+
+    def _write_put(self, _item: ItemResponse) -> None:
+        if _item.id > self.capacity:
+            new_capacity = max(self.capacity * 2, _item.id)
+            os.ftruncate(self.fd, self.REGION + new_capacity * self.SLOT_SIZE)
+            self._map_slots(new_capacity)
+
+        name = _item.name.encode()
+        description = b"" if _item.description is None else _item.description.encode()
+        desc_len = self.NO_DESCRIPTION if _item.description is None else len(description)
+        offset = (_item.id - 1) * self.SLOT_SIZE
+
+        self.SLOT.pack_into(self.slots, offset, 1, _item.in_stock, _item.price, _item.version, len(name), desc_len)
+        self.slots[offset + self.SLOT.size:offset + self.SLOT.size + len(name) + len(description)] = name + description
+        self._journal(_item.id)
+
+    def _write_delete(self, _item_id: int) -> None:
+        self.slots[(_item_id - 1) * self.SLOT_SIZE] = 0  # 사용중 표시만 지우기
+        self._journal(_item_id)
+
+    def _journal(self, _item_id: int) -> None:
+        seq = self.seq + 1
+        struct.pack_into("<q", self.region, 64 + ((seq - 1) % self.JOURNAL_SIZE) * 8, _item_id)
+        self._write_header(self.capacity, seq)  # seq 는 칸과 journal 을 다 쓴 다음에 올리기
+        self.seq = seq
+
+    # --- 따라잡기 ---
+
+    def _read_slot(self, _item_id: int) -> Optional[ItemResponse]:
+        if _item_id > self.capacity:
+            return None
+
+        offset = (_item_id - 1) * self.SLOT_SIZE
+        used, in_stock, price, version, name_len, desc_len = self.SLOT.unpack_from(self.slots, offset)
+
+        if not used:
+            return None
+
+        text = offset + self.SLOT.size
+        name = self.slots[text:text + name_len].decode()
+        description = None
+
+        if desc_len != self.NO_DESCRIPTION:
+            description = self.slots[text + name_len:text + name_len + desc_len].decode()
+
+        # 직접 쓴 값이라 검증은 건너뜀
+        return ItemResponse.model_construct(
+            id=_item_id, name=name, price=price, in_stock=bool(in_stock), description=description, version=version
+        )
+
+    def _catch_up(self) -> None:
+        """다른 워커가 쓴 변경을 로컬 사본에 반영 (self.lock 과 파일 락을 잡은 상태에서 호출)"""
+        _, capacity, next_id, seq, last_version = self._header()
+
+        if seq == self.seq:
+            return
+
+        if seq - self.seq > self.JOURNAL_SIZE:  # 너무 오래 안 봐서 journal 이 한바퀴 넘게 돌았으면 전체 다시 읽기
+            self._rescan()
+
+            return
+
+        if capacity != self.capacity:
+            self._map_slots(capacity)
+
+        for s in range(self.seq + 1, seq + 1):
+            item_id = struct.unpack_from("<q", self.region, 64 + ((s - 1) % self.JOURNAL_SIZE) * 8)[0]
+            item = self._read_slot(item_id)
+
+            if item is not None:
+                old = self.items.get(item_id)
+
+                if old is None or old.version != item.version:
+                    self._apply_put(item)
+            elif item_id in self.items:
+                removed = self.items.pop(item_id)
+                self.index.remove(removed)
+                self._notify(removed, None)
+
+        self._sync_header(next_id, seq, last_version)
+
+    def _rescan(self) -> None:
+        """모든 칸을 다시 읽어서 로컬 사본과 인덱스를 새로 만들기"""
+        _, capacity, next_id, seq, last_version = self._header()
+        self._map_slots(capacity)
+
+        old_items = self.items
+        self.items = {}
+
+        for item_id in range(1, min(next_id, capacity + 1)):
+            item = self._read_slot(item_id)
+
+            if item is not None:
+                self.items[item_id] = item
+
+        self.index.build(self.items.values())
+
+        for item_id, item in self.items.items():
+            old = old_items.get(item_id)
+
+            if old is None or old.version != item.version:
+                self._notify(old, item)
+
+        for item_id, removed in old_items.items():
+            if item_id not in self.items:
+                self._notify(removed, None)
+
+        self._sync_header(next_id, seq, last_version)
+
+    def _sync_header(self, _next_id: int, _seq: int, _last_version: int) -> None:
+        self.next_id = _next_id
+        self.seq = _seq
+        self.clock.last = max(self.clock.last, _last_version)
+        self.version = _last_version  # 전체 목록의 버전도 모든 워커에서 같은 값
+
+
+ItemStore = Union[MemoryStore, SqliteStore]
+
+
+def make_store() -> ItemStore:
+    """ITEM_STORE 환경변수로 저장소 고르기: memory(기본), log, sqlite, shared"""
+    kind = os.environ.get("ITEM_STORE", "memory")
+    path = os.environ.get("ITEM_STORE_PATH", "items_data")
+
+    if kind == "log":
+        return LogStore(path)
+
+    if kind == "sqlite":
+        return SqliteStore(os.path.join(path, "items.db"))
+
+    if kind == "shared":
+        return SharedStore(os.path.join(path, "items.shm"), int(os.environ.get("ITEM_SHM_CAPACITY", 100_000)))
+
+    return MemoryStore()
+
+
+def msgpack_encode(_value) -> bytes:
+    """아이템에 나오는 타입(None, bool, int, float, str, list, dict)만 다루는 작은 msgpack 인코더"""
+    if _value is None:
+        return b"\xc0"
+    if _value is True:
+        return b"\xc3"
+    if _value is False:
+        return b"\xc2"
+    if isinstance(_value, int):
+        if 0 <= _value < 0x80:
+            return struct.pack("B", _value)
+        if -32 <= _value < 0:
+            return struct.pack("b", _value)
+
+        # 나머지는 값이 들어가는 가장 작은 크기로 (양수는 uint, 음수는 int)
+        for limit, code, fmt in (
+            ((0x100, b"\xcc", ">B"), (0x10000, b"\xcd", ">H"), (1 << 32, b"\xce", ">I"), (1 << 64, b"\xcf", ">Q"))
+            if _value > 0 else
+            ((0x80, b"\xd0", ">b"), (0x8000, b"\xd1", ">h"), (1 << 31, b"\xd2", ">i"), (1 << 63, b"\xd3", ">q"))
+        ):
+            if -limit <= _value < limit:
+                return code + struct.pack(fmt, _value)
+
+        raise OverflowError(f"msgpack 정수 범위를 넘음: {_value}")
+    if isinstance(_value, float):
+        return b"\xcb" + struct.pack(">d", _value)
+    if isinstance(_value, str):
+        data = _value.encode()
+        n = len(data)
+
+        if n < 32:
+            return struct.pack("B", 0xA0 | n) + data
+        if n < 0x100:
+            return b"\xd9" + struct.pack("B", n) + data
+        if n < 0x10000:
+            return b"\xda" + struct.pack(">H", n) + data
+
+        return b"\xdb" + struct.pack(">I", n) + data
+    if isinstance(_value, (list, tuple)):
+        return msgpack_array_header(len(_value)) + b"".join(msgpack_encode(v) for v in _value)
+    if isinstance(_value, dict):
+        n = len(_value)
+        header = struct.pack("B", 0x80 | n) if n < 16 else b"\xde" + struct.pack(">H", n)
+
+        return header + b"".join(msgpack_encode(k) + msgpack_encode(v) for k, v in _value.items())
+
+    raise TypeError(f"msgpack 으로 바꿀 수 없는 타입: {type(_value).__name__}")
+
+
+def msgpack_array_header(_n: int) -> bytes:
+    if _n < 16:
+        return struct.pack("B", 0x90 | _n)
+    if _n < 0x10000:
+        return b"\xdc" + struct.pack(">H", _n)
+
+    return b"\xdd" + struct.pack(">I", _n)
+
+
+class ItemSerializer:
+    """아이템 응답 형식 하나 (Accept 로 고름)
+
+    인코딩한 결과는 여기서 따로 보관하지 않고 ResponseCache 가 크기 제한(LRU) 안에서 보관
+    목록은 아이템마다 나눠서 부르지 않고 한 번에 인코딩 (파이썬 반복이 없어서 빠름)
+    """
+
+    media_type = "application/json"
+    etag_suffix = ""  # 같은 버전이라도 형식이 다르면 다른 ETag
+
+    def encode_item(self, _item: ItemResponse) -> bytes:
+        # model_dump_json() 과 같은 결과지만 인자 처리를 건너뛰어서 3배쯤 빠름
+        return ItemResponse.__pydantic_serializer__.to_json(_item)
+
+    def encode_list(self, _items: list[ItemResponse]) -> bytes:
+        return ITEM_LIST_ADAPTER.dump_json(_items)
+
+
+class MsgpackSerializer(ItemSerializer):
+    """msgpack: JSON 과 같은 구조의 바이너리, 숫자를 고정 길이로 써서 파싱이 빠르고 대체로 더 작음"""
+
+    media_type = "application/msgpack"
+    etag_suffix = "-msgpack"
+
+    def encode_item(self, _item: ItemResponse) -> bytes:
+        # 필드가 모두 기본 타입이라 model_dump() 로 새 dict 를 만들 필요 없이 __dict__ 를 그대로 사용
+        return msgpack.packb(_item.__dict__) if msgpack is not None else msgpack_encode(_item.__dict__)
+
+    def encode_list(self, _items: list[ItemResponse]) -> bytes:
+        values = [item.__dict__ for item in _items]
+
+        return msgpack.packb(values) if msgpack is not None else msgpack_encode(values)
+
+
+class NdjsonSerializer(ItemSerializer):
+    """NDJSON: 한 줄에 아이템 하나, /items 목록에서만 고를 수 있고 한 번에 만들지 않고 조금씩 보냄 (stream_items)"""
+
+    media_type = "application/x-ndjson"
+    etag_suffix = "-ndjson"
+
+    def encode_list(self, _items: list[ItemResponse]) -> bytes:
+        return b"".join(self.encode_item(item) + b"\n" for item in _items)
+
+
+ITEM_LIST_ADAPTER = TypeAdapter(list[ItemResponse])
+SERIALIZERS: dict[str, ItemSerializer] = {"application/json": ItemSerializer()}
+
+if msgpack is not None:
+    # 순수 파이썬 인코더(msgpack_encode)는 JSON 보다 10배 넘게 느려서 C 라이브러리가 있을 때만 제공
+    SERIALIZERS["application/msgpack"] = SERIALIZERS["application/x-msgpack"] = MsgpackSerializer()
+
+NDJSON = NdjsonSerializer()
+STREAM_SERIALIZERS = {**SERIALIZERS, NDJSON.media_type: NDJSON}  # 스트리밍할 수 있는 경로(/items)에서 고를 수 있는 형식
+
+
+ACCEPT_CACHE: dict[tuple[str, bool], Optional[ItemSerializer]] = {}  # (Accept 값, _stream) -> negotiate 결과
+
+
+def negotiate(_accept: Optional[str], _stream: bool = False) -> Optional[ItemSerializer]:
+    """Accept 헤더에서 q 값이 가장 높은 형식, 아무것도 맞지 않으면 None (406)
+
+    _stream 이면 NDJSON 도 후보 (STREAM_SERIALIZERS), q=0 이면 다른 형식처럼 고르지 않음
+    Accept 값은 종류가 몇 개 안 되니까 한 번 해석한 결과는 ACCEPT_CACHE 에 기억
+    """
+    if not _accept:
+        return SERIALIZERS["application/json"]
+
+    formats = STREAM_SERIALIZERS if _stream else SERIALIZERS
+    serializer = ACCEPT_CACHE.get((_accept, _stream), False)
+
+    if serializer is not False:
+        return serializer
+
+    best, best_q = None, 0.0
+
+    for part in _accept.split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+
+        if media_type in ("*/*", "application/*"):
+            candidate = SERIALIZERS["application/json"]
+        else:
+            candidate = formats.get(media_type.lower())
+
+        if candidate is not None and q > best_q:
+            best, best_q = candidate, q
+
+    if len(ACCEPT_CACHE) > 256:
+        ACCEPT_CACHE.clear()
+
+    ACCEPT_CACHE[(_accept, _stream)] = best
+
+    return best
+
+
+class ResponseCache:
+    """직렬화가 끝난 응답(JSON bytes) 캐시 - 같은 요청이면 검증/직렬화 없이 그대로 돌려줌
+
+    - 키는 ("item", id, 형식) 또는 ("page", 정렬, 순서, in_stock, offset 또는 cursor, limit, 형식)
+    - max_bytes 를 넘으면 가장 오래 안 쓴 것부터 버림 (LRU)
+    - 아이템이 바뀌면 그 아이템의 항목과, 영향을 받는 목록 페이지들만 지움 (on_change)
+    - generation: 변경될 때마다 1씩 증가. 읽기 시작할 때의 값과 다르면 그 사이에 바뀐 것이라 저장 안함
+    - 본문과 함께 그 본문의 버전(ETag)과, 있으면 추가 헤더(다음 페이지 cursor 등)도 저장
+    """
+
+    ENTRY_OVERHEAD = 200  # 키, OrderedDict 노드 등 bytes 외의 대략적인 메모리
+    ID_OVERHEAD = 40      # 페이지에 들어있는 id 하나를 기억하는 데 드는 대략적인 메모리
+
+    def __init__(self, _max_bytes: int, _refresh: Callable[[], None]) -> None:
+        self.max_bytes = _max_bytes
+        self.refresh = _refresh  # 찾기 전에 저장소를 최신으로 (다른 워커의 변경이 여기서 on_change 로 들어옴)
+        self.entries: OrderedDict[tuple, tuple[bytes, int, Optional[dict]]] = OrderedDict()
+        self.page_keys: dict[tuple, frozenset[int]] = {}  # 페이지 키 -> 그 페이지에 들어있는 id 들
+        self.item_keys: dict[int, set[tuple]] = {}  # id -> 그 아이템의 형식별 키들
+        self.size = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, _key: tuple) -> Optional[tuple[bytes, int, Optional[dict]]]:
+        """(본문, 버전, 추가 헤더), 없으면 None"""
+        self.refresh()
+
+        with self.lock:
+            entry = self.entries.get(_key)
+
+            if entry is None:
+                self.misses += 1
+
+                return None
+
+            self.entries.move_to_end(_key)  # 최근에 쓴 것은 맨 뒤로
+            self.hits += 1
+
+            return entry
+
+    def put(
+        self,
+        _key: tuple,
+        _body: bytes,
+        _version: int,
+        _generation: int,
+        _headers: Optional[dict] = None,
+        _ids: frozenset[int] = frozenset(),
+    ) -> None:
+        """_ids: 목록 페이지면 그 페이지에 들어있는 아이템 id 들"""
+        size = len(_body) + self.ENTRY_OVERHEAD + len(_ids) * self.ID_OVERHEAD
+
+        with self.lock:
+            if _generation != self.generation or size > self.max_bytes:
+                return
+
+            self._remove(_key)
+            self.entries[_key] = (_body, _version, _headers)
+            self.size += size
+
+            if _key[0] == "page":
+                self.page_keys[_key] = _ids
+            else:
+                self.item_keys.setdefault(_key[1], set()).add(_key)
+
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))  # 맨 앞이 가장 오래 안 쓴 것
+                self.evictions += 1
+
+    def on_change(self, _old: Optional[ItemResponse], _new: Optional[ItemResponse]) -> None:
+        """저장소 변경 알림을 받아 영향 받는 항목만 지우기
+
+        목록 페이지는 (정렬, in_stock) 인덱스마다 따져봄
+        - 아이템이 그 인덱스에 새로 들어오거나 빠지거나 정렬키가 바뀌면 순서가 밀리므로 그 인덱스의 페이지 전부
+        - 정렬키가 그대로면 순서는 같고 내용만 바뀌므로 그 아이템이 들어있는 페이지만
+        - 아이템이 수정 전에도 후에도 들어있지 않은 인덱스(다른 재고 상태)의 페이지는 그대로
+        """
+        item_id = (_new or _old).id
+
+        def in_index(_item: Optional[ItemResponse], _in_stock: Optional[bool]) -> bool:
+            return _item is not None and (_in_stock is None or _item.in_stock == _in_stock)
+
+        with self.lock:
+            self.generation += 1
+
+            for key in list(self.item_keys.get(item_id, ())):
+                self._remove(key)
+
+            for key, ids in list(self.page_keys.items()):
+                sort, in_stock = key[1], key[3]
+                was_in, is_in = in_index(_old, in_stock), in_index(_new, in_stock)
+
+                if not was_in and not is_in:
+                    continue
+
+                if was_in and is_in and getattr(_old, sort) == getattr(_new, sort) and item_id not in ids:
+                    continue
+
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, _key: tuple) -> None:
+        entry = self.entries.pop(_key, None)
+
+        if entry is not None:
+            self.size -= len(entry[0]) + self.ENTRY_OVERHEAD
+
+            if _key[0] == "page":
+                self.size -= len(self.page_keys.pop(_key)) * self.ID_OVERHEAD
+            else:
+                keys = self.item_keys[_key[1]]
+                keys.discard(_key)
+
+                if not keys:
+                    del self.item_keys[_key[1]]
+
+
+class SingleFlight:
+    """같은 계산이 이미 진행 중이면 새로 하지 않고 끝나기를 기다렸다가 그 결과를 같이 받기
+
+    캐시가 비어있을 때 같은 요청이 한꺼번에 몰리면(thundering herd) 모두 같은 목록을 꺼내고 직렬화하게 되는데,
+    첫 요청(leader)만 계산하고 나머지(follower)는 기다림
+    - 키에 캐시의 generation 을 넣어서, 변경이 생긴 뒤에 온 요청은 진행 중인 (이제는 옛날) 계산에 붙지 않고 새로 계산
+    - 계산이 끝나면 바로 지움 (결과를 보관하는 건 ResponseCache 의 일)
+    """
+
+    class Call:
+        __slots__ = ("done", "result", "error")
+
+        def __init__(self) -> None:
+            self.done = threading.Event()
+            self.result = None
+            self.error: Optional[BaseException] = None
+
+    def __init__(self) -> None:
+        self.calls: dict[tuple, SingleFlight.Call] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.lock = threading.Lock()
+
+    def do(self, _key: tuple, _generation: int, _fn: Callable):
+        key = (*_key, _generation)
+
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self.calls[key] = SingleFlight.Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = _fn()
+
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self.calls)}
+
+
+class SearchIndex:
+    """이름/설명 전문 검색용 역색인(inverted index) - 글자(n-gram) 단위
+
+    한국어는 띄어쓰기로 나누면 "굉장한 사과" 에서 "사과" 로는 찾을 수 있어도 "장한" 이나 "바나" 로는 못 찾음
+    그래서 단어마다 한 글자(1-gram)와 붙어있는 두 글자(2-gram)를 모두 토큰으로 색인함
+    - postings: 토큰 -> {아이템 id: 가중치 합}, 이름에 나온 토큰은 NAME_WEIGHT 배
+    - 검색어의 토큰을 모두 가진 아이템만 후보 (가장 드문 토큰의 목록부터 교집합)
+    - 점수는 TF-IDF: 토큰이 많이 나올수록, 전체에서 드문 토큰일수록 높음
+    """
+
+    NAME_WEIGHT = 2.0
+
+    def __init__(self) -> None:
+        self.postings: dict[str, dict[int, float]] = {}
+        self.doc_tokens: dict[int, Counter] = {}  # 아이템을 지울 때 어떤 목록에서 빼야 하는지
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def normalize(_text: str) -> list[str]:
+        return unicodedata.normalize("NFKC", _text).lower().split()
+
+    @classmethod
+    def document_tokens(cls, _item: ItemResponse) -> Counter:
+        tokens: Counter = Counter()
+
+        for text, weight in ((_item.name, cls.NAME_WEIGHT), (_item.description or "", 1.0)):
+            for word in cls.normalize(text):
+                for i, char in enumerate(word):
+                    tokens[char] += weight
+
+                    if i + 1 < len(word):
+                        tokens[word[i:i + 2]] += weight
+
+        return tokens
+
+    @classmethod
+    def query_tokens(cls, _query: str) -> set[str]:
+        """검색어는 두 글자 이상이면 2-gram 만, 한 글자 단어는 그 글자로"""
+        tokens = set()
+
+        for word in cls.normalize(_query):
+            if len(word) == 1:
+                tokens.add(word)
+
+            tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+
+        return tokens
+
+    def build(self, _items) -> None:
+        for item in _items:
+            self._add(item)
+
+    def on_change(self, _old: Optional[ItemResponse], _new: Optional[ItemResponse]) -> None:
+        """저장소 변경 알림을 받아 바뀐 아이템의 토큰만 고치기"""
+        with self.lock:
+            if _old is not None:
+                self._remove(_old.id)
+
+            if _new is not None:
+                self._add(_new)
+
+    def search(self, _query: str, _limit: int) -> list[int]:
+        """점수가 높은 순서로 아이템 id 목록"""
+        tokens = self.query_tokens(_query)
+
+        if not tokens:
+            return []
+
+        with self.lock:
+            lists = sorted((self.postings.get(token, {}) for token in tokens), key=len)
+            candidates = set(lists[0])
+
+            for postings in lists[1:]:
+                if not candidates:
+                    break
+
+                candidates.intersection_update(postings)
+
+            total = len(self.doc_tokens)
+            idf = [math.log(1 + total / len(postings)) for postings in lists if postings]
+            scored = [
+                (sum(postings[item_id] * weight for postings, weight in zip(lists, idf)), -item_id)
+                for item_id in candidates
+            ]
+
+        return [-neg_id for _, neg_id in heapq.nlargest(_limit, scored)]
+
+    def _add(self, _item: ItemResponse) -> None:
+        tokens = self.document_tokens(_item)
+        self.doc_tokens[_item.id] = tokens
+
+        for token, weight in tokens.items():
+            self.postings.setdefault(token, {})[_item.id] = weight
+
+    def _remove(self, _item_id: int) -> None:
+        for token in self.doc_tokens.pop(_item_id, ()):
+            postings = self.postings[token]
+            del postings[_item_id]
+
+            if not postings:
+                del self.postings[token]
+
+
+class PriceGroup:
+    """한 그룹(재고 있음/없음)의 개수, 가격 합계, 최소/최대 가격
+
+    최소/최대는 힙 두 개로 관리하고, 지운 가격은 바로 힙에서 빼지 않고 live 에서만 개수를 줄였다가
+    힙 맨 위에 올라왔을 때 버림 (lazy deletion) - 추가/삭제 O(log n), 최소/최대 조회 O(1)
+    맨 위에 오지 않은 지운 가격은 계속 쌓이므로, 힙이 live 의 두 배를 넘으면 live 로 다시 만듦 (나눠 보면 O(1))
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.live: Counter = Counter()  # 가격 -> 지금 그 가격인 아이템 수
+        self.min_heap: list[float] = []
+        self.max_heap: list[float] = []  # 부호를 바꿔서 넣은 최소 힙
+
+    def add(self, _price: float) -> None:
+        self.count += 1
+        self.total += _price
+        self.live[_price] += 1
+
+        if self.live[_price] == 1:  # 같은 가격이 이미 힙에 있으면 다시 넣지 않음
+            heapq.heappush(self.min_heap, _price)
+            heapq.heappush(self.max_heap, -_price)
+
+    def remove(self, _price: float) -> None:
+        self.count -= 1
+        self.total = self.total - _price if self.count else 0.0  # 비었을 때 부동소수 오차가 남지 않게
+        self.live[_price] -= 1
+
+        if self.live[_price] == 0:
+            del self.live[_price]
+
+            if max(len(self.min_heap), len(self.max_heap)) > 2 * len(self.live) + 16:
+                self.min_heap = list(self.live)
+                self.max_heap = [-price for price in self.live]
+                heapq.heapify(self.min_heap)
+                heapq.heapify(self.max_heap)
+
+                return
+
+            # 맨 위가 지워진 가격이면 살아있는 가격이 나올 때까지 버려서 조회는 항상 맨 위만 보면 되도록
+            while self.min_heap and self.min_heap[0] not in self.live:
+                heapq.heappop(self.min_heap)
+
+            while self.max_heap and -self.max_heap[0] not in self.live:
+                heapq.heappop(self.max_heap)
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "min_price": self.min_heap[0] if self.count else None,
+            "max_price": -self.max_heap[0] if self.count else None,
+            "mean_price": self.total / self.count if self.count else None,
+        }
+
+
+class CatalogStats:
+    """아이템 개수, 재고 비율, 가격 최소/최대/평균을 변경 알림을 받을 때마다 조금씩 고쳐두는 집계
+
+    /items 를 전부 읽어서 계산하지 않기 때문에 카탈로그 크기와 상관없이 바로 응답
+    전체 값은 두 그룹을 합쳐서 계산 (개수/합계는 더하고, 최소/최대는 둘 중 작은/큰 것)
+    """
+
+    def __init__(self) -> None:
+        self.groups = {True: PriceGroup(), False: PriceGroup()}
+        self.lock = threading.Lock()
+
+    def build(self, _items) -> None:
+        for item in _items:
+            self.groups[item.in_stock].add(item.price)
+
+    def on_change(self, _old: Optional[ItemResponse], _new: Optional[ItemResponse]) -> None:
+        with self.lock:
+            if _old is not None:
+                self.groups[_old.in_stock].remove(_old.price)
+
+            if _new is not None:
+                self.groups[_new.in_stock].add(_new.price)
+
+    def summary(self, _group_by_in_stock: bool = False) -> dict:
+        with self.lock:
+            in_stock, out_of_stock = self.groups[True].summary(), self.groups[False].summary()
+            count = in_stock["count"] + out_of_stock["count"]
+            total = self.groups[True].total + self.groups[False].total
+            mins = [group["min_price"] for group in (in_stock, out_of_stock) if group["count"]]
+            maxs = [group["max_price"] for group in (in_stock, out_of_stock) if group["count"]]
+
+        result = {
+            "count": count,
+            "in_stock_ratio": in_stock["count"] / count if count else None,
+            "min_price": min(mins, default=None),
+            "max_price": max(maxs, default=None),
+            "mean_price": total / count if count else None,
+        }
+
+        if _group_by_in_stock:
+            result["groups"] = {"true": in_stock, "false": out_of_stock}
+
+        return result
+
+
+class OrderStore:
+    """유저와 주문 (메모리), ITEM_STORE=memory 일 때 (make_order_store)
+
+    - user_orders: 유저 id -> 그 유저의 주문 id 목록 (보조 인덱스)
+      주문 id 는 계속 커지기만 해서 뒤에 붙이기만 해도 정렬된 상태, 한 유저의 주문 k 개를 볼 때 O(k)
+    - 주문에는 아이템 id, 수량, 주문 당시 가격만 저장하고, 응답할 때 필요한 아이템을 get_many 로 한번에 가져와서 붙임
+      (주문마다, 줄마다 fake_db.get 을 부르는 N+1 조회를 하지 않음)
+    """
+
+    def __init__(self, _items: ItemStore) -> None:
+        self.items = _items
+        self.users: dict[int, UserResponse] = {}
+        self.orders: dict[int, tuple[int, list[tuple[int, int, float]]]] = {}  # id -> (유저 id, [(아이템 id, 수량, 가격)])
+        self.user_orders: dict[int, list[int]] = {}
+        self.next_user_id = 1
+        self.next_order_id = 1
+        self.lock = threading.Lock()
+
+    def create_user(self, _user: User) -> UserResponse:
+        with self.lock:
+            user = UserResponse(id=self.next_user_id, name=_user.name)
+            self.users[user.id] = user
+            self.user_orders[user.id] = []
+            self.next_user_id += 1
+
+        return user
+
+    def get_user(self, _user_id: int) -> Optional[UserResponse]:
+        return self.users.get(_user_id)
+
+    def create_order(self, _user_id: int, _order: Order) -> Union[OrderResponse, list[int], None]:
+        """주문 추가, 유저가 없으면 None, 없는 아이템이 있으면 그 id 목록"""
+        if _user_id not in self.users:
+            return None
+
+        items = self.items.get_many(line.item_id for line in _order.lines)
+        missing = [line.item_id for line in _order.lines if line.item_id not in items]
+
+        if missing:
+            return missing
+
+        lines = [(line.item_id, line.quantity, items[line.item_id].price) for line in _order.lines]
+
+        with self.lock:
+            order_id = self.next_order_id
+            self.next_order_id += 1
+            self.orders[order_id] = (_user_id, lines)
+            self.user_orders[_user_id].append(order_id)
+
+        return self._responses([(order_id, _user_id, lines)], items)[0]
+
+    def user_order_list(self, _user_id: int, _offset: int, _limit: int) -> Optional[list[OrderResponse]]:
+        """유저의 주문 목록 (최신순), 유저가 없으면 None"""
+        with self.lock:
+            order_ids = self.user_orders.get(_user_id)
+
+            if order_ids is None:
+                return None
+
+            n = len(order_ids)
+            page = order_ids[max(n - _offset - _limit, 0):max(n - _offset, 0)][::-1]
+            orders = [(order_id, *self.orders[order_id]) for order_id in page]
+
+        return self._responses(orders)
+
+    def user_order(self, _user_id: int, _order_id: int) -> Optional[OrderResponse]:
+        order = self.orders.get(_order_id)
+
+        if order is None or order[0] != _user_id:
+            return None  # 다른 유저의 주문도 없는 것처럼
+
+        return self._responses([(_order_id, *order)])[0]
+
+    def close(self) -> None:
+        """메모리에만 있어서 할 일 없음"""
+
+    def _responses(
+        self, _orders: list[tuple[int, int, list[tuple[int, int, float]]]], _items: Optional[dict[int, ItemResponse]] = None
+    ) -> list[OrderResponse]:
+        """(주문 id, 유저 id, [(아이템 id, 수량, 가격)]) 목록 -> 응답, 주문 줄의 아이템은 get_many 한 번으로"""
+        if _items is None:
+            # 모든 주문의 모든 줄에 나오는 아이템을 모아서 한 번에
+            _items = self.items.get_many({item_id for _, _, lines in _orders for item_id, _, _ in lines})
+
+        return [
+            OrderResponse(
+                id=order_id,
+                user_id=user_id,
+                total=sum(price * quantity for _, quantity, price in lines),
+                lines=[
+                    OrderLineResponse(item_id=item_id, quantity=quantity, price=price, item=_items.get(item_id))
+                    for item_id, quantity, price in lines
+                ],
+            )
+            for order_id, user_id, lines in _orders
+        ]
+
+
+class SqliteOrderStore(OrderStore, SqliteConnections):
+    """유저와 주문 (SQLite), ITEM_STORE 가 log, sqlite, shared 일 때 (make_order_store)
+
+    아이템이 재시작 뒤에도 남으면 그 아이템을 가리키는 주문도 남아야 하고,
+    여러 워커 프로세스가 있으면 유저/주문 id 도 모든 워커가 같이 써야 해서 메모리 dict 로는 안 됨
+    - id 는 AUTOINCREMENT 라서 여러 프로세스가 동시에 추가해도 겹치지 않음
+    - 유저의 주문 목록은 (user_id, id) 인덱스로, 한 페이지의 주문 줄은 IN (...) 한 번으로 읽음
+    """
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS orders (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_user ON orders (user_id, id)",
+        "CREATE TABLE IF NOT EXISTS order_lines ("
+        "order_id INTEGER NOT NULL, line INTEGER NOT NULL, item_id INTEGER NOT NULL, "
+        "quantity INTEGER NOT NULL, price REAL NOT NULL, PRIMARY KEY (order_id, line)) WITHOUT ROWID",
+    ]
+
+    def __init__(self, _path: str, _items: ItemStore) -> None:
+        SqliteConnections.__init__(self, _path)
+        self.items = _items
+
+        with self._transaction() as conn:
+            for sql in self.SCHEMA:
+                conn.execute(sql)
+
+    def create_user(self, _user: User) -> UserResponse:
+        cur = self._conn().execute("INSERT INTO users (name) VALUES (?)", (_user.name,))
+
+        return UserResponse(id=cur.lastrowid, name=_user.name)
+
+    def get_user(self, _user_id: int) -> Optional[UserResponse]:
+        row = self._conn().execute("SELECT id, name FROM users WHERE id = ?", (_user_id,)).fetchone()
+
+        return None if row is None else UserResponse(id=row[0], name=row[1])
+
+    def create_order(self, _user_id: int, _order: Order) -> Union[OrderResponse, list[int], None]:
+        """주문 추가, 유저가 없으면 None, 없는 아이템이 있으면 그 id 목록"""
+        if self.get_user(_user_id) is None:
+            return None
+
+        items = self.items.get_many(line.item_id for line in _order.lines)
+        missing = [line.item_id for line in _order.lines if line.item_id not in items]
+
+        if missing:
+            return missing
+
+        lines = [(line.item_id, line.quantity, items[line.item_id].price) for line in _order.lines]
+
+        with self._transaction() as conn:
+            order_id = conn.execute("INSERT INTO orders (user_id) VALUES (?)", (_user_id,)).lastrowid
+            conn.executemany(
+                "INSERT INTO order_lines (order_id, line, item_id, quantity, price) VALUES (?, ?, ?, ?, ?)",
+                [(order_id, n, *line) for n, line in enumerate(lines)],
+            )
+
+        return self._responses([(order_id, _user_id, lines)], items)[0]
+
+    def user_order_list(self, _user_id: int, _offset: int, _limit: int) -> Optional[list[OrderResponse]]:
+        """유저의 주문 목록 (최신순), 유저가 없으면 None"""
+        if self.get_user(_user_id) is None:
+            return None
+
+        rows = self._conn().execute(
+            "SELECT id FROM orders WHERE user_id = ? ORDER BY id DESC LIMIT ? OFFSET ?", (_user_id, _limit, _offset)
+        )
+
+        return self._responses(self._orders(_user_id, [row[0] for row in rows]))
+
+    def user_order(self, _user_id: int, _order_id: int) -> Optional[OrderResponse]:
+        row = self._conn().execute("SELECT user_id FROM orders WHERE id = ?", (_order_id,)).fetchone()
+
+        if row is None or row[0] != _user_id:
+            return None  # 다른 유저의 주문도 없는 것처럼
+
+        return self._responses(self._orders(_user_id, [_order_id]))[0]
+
+    def _orders(self, _user_id: int, _order_ids: list[int]) -> list[tuple[int, int, list[tuple[int, int, float]]]]:
+        """주문 id 들 -> (주문 id, 유저 id, [(아이템 id, 수량, 가격)]), 한 페이지(최대 100개)라서 IN (...) 한 번"""
+        lines: dict[int, list[tuple[int, int, float]]] = {order_id: [] for order_id in _order_ids}
+        sql = (
+            "SELECT order_id, item_id, quantity, price FROM order_lines "
+            f"WHERE order_id IN ({', '.join('?' * len(_order_ids))}) ORDER BY order_id, line"
+        )
+
+        for order_id, item_id, quantity, price in self._conn().execute(sql, _order_ids):
+            lines[order_id].append((item_id, quantity, price))
+
+        return [(order_id, _user_id, order_lines) for order_id, order_lines in lines.items()]
+
+
+def make_order_store(_items: ItemStore) -> OrderStore:
+    """아이템 저장소에 맞춰서 유저/주문 저장소 고르기
+
+    memory 가 아니면 SQLite 에 저장 (sqlite 는 아이템과 같은 DB 파일, log/shared 는 같은 폴더의 orders.db)
+    """
+    kind = os.environ.get("ITEM_STORE", "memory")
+    path = os.environ.get("ITEM_STORE_PATH", "items_data")
+
+    if kind == "memory":
+        return OrderStore(_items)
+
+    return SqliteOrderStore(os.path.join(path, "items.db" if kind == "sqlite" else "orders.db"), _items)
+
+
+class ChangeFeed:
+    """아이템 변경(create/update/delete) 이벤트를 순서 번호(seq)와 함께 보관하고 SSE 로 흘려보내기
+
+    - 최근 _capacity 개만 링 버퍼(deque(maxlen))에 보관, 오래된 것은 자동으로 밀려남
+    - seq 는 1씩 커지기 때문에 "seq 이후의 이벤트" 는 버퍼 안의 위치를 바로 계산해서 꺼냄
+    - 클라이언트는 마지막으로 받은 seq(Last-Event-ID) 부터 이어받고,
+      그 사이 이벤트가 이미 밀려났으면 reset 이벤트를 받고 목록을 처음부터 다시 받아야 함
+    - 변경 알림은 스레드풀에서 오지만 기다리는 쪽은 이벤트 루프의 asyncio.Event 라서
+      loop.call_soon_threadsafe 로 깨움
+    - seq 는 프로세스마다 따로 셈 (워커가 여러 개면 같은 워커에 다시 붙어야 이어받기가 맞음)
+    - 다른 워커의 변경은 refresh() 안에서 on_change 로 들어오는데, 읽기 요청이 없는 워커에서는 아무도 부르지 않으므로
+      기다리는 스트림이 있는 동안 poller 태스크 하나가 POLL 초마다 직접 refresh (스트림 수와 상관없이 하나)
+      _refresh 가 None 이면(다른 프로세스가 바꿀 수 없는 저장소) 확인하지 않음
+    """
+
+    HEARTBEAT = 15.0  # 이벤트가 없어도 이 간격(초)으로 주석 한 줄을 보내서 연결 유지
+    POLL = 0.5        # 다른 워커의 변경을 확인하는 간격(초)
+
+    def __init__(self, _capacity: int, _refresh: Optional[Callable[[], None]] = None) -> None:
+        self.refresh = _refresh
+        self.events: deque[tuple[int, str, str]] = deque(maxlen=_capacity)  # (seq, 종류, data JSON)
+        self.seq = 0
+        self.waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self.lock = threading.Lock()
+        self.poller: Optional[asyncio.Task] = None
+
+    def on_change(self, _old: Optional[ItemResponse], _new: Optional[ItemResponse]) -> None:
+        kind = "create" if _old is None else "delete" if _new is None else "update"
+        item = "null" if _new is None else _new.model_dump_json()
+
+        with self.lock:
+            self.seq += 1
+            data = f'{{"seq":{self.seq},"type":"{kind}","id":{(_new or _old).id},"item":{item}}}'
+            self.events.append((self.seq, kind, data))
+            waiters = list(self.waiters)
+
+        for loop, wakeup in waiters:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def after(self, _seq: int) -> Optional[list[tuple[int, str, str]]]:
+        """_seq 다음부터의 이벤트, 그 사이 이벤트가 버퍼에서 이미 밀려났으면 None"""
+        with self.lock:
+            if _seq == self.seq:
+                return []
+
+            first = self.events[0][0] if self.events else self.seq + 1
+
+            if _seq > self.seq or _seq < first - 1:
+                return None
+
+            return list(islice(self.events, _seq - first + 1, None))
+
+    async def poll(self) -> None:
+        """기다리는 스트림이 남아있는 동안 POLL 초마다 refresh, 새 변경이 있으면 on_change 가 모두를 깨움"""
+        while True:
+            await asyncio.sleep(self.POLL)
+
+            with self.lock:
+                if not self.waiters:
+                    return
+
+            await run_in_threadpool(self.refresh)
+
+    async def stream(self, _since: Optional[int]) -> AsyncIterator[bytes]:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        wakeup = waiter[1]
+
+        with self.lock:
+            self.waiters.add(waiter)
+            last = self.seq if _since is None else _since  # 처음 붙으면 지금 이후의 변경만
+
+        if self.refresh is not None and (self.poller is None or self.poller.done()):
+            self.poller = waiter[0].create_task(self.poll())
+
+        try:
+            yield b"retry: 3000\n\n"  # 끊기면 3초 뒤에 Last-Event-ID 를 붙여서 다시 연결
+
+            while True:
+                wakeup.clear()  # 읽기 전에 지워야 읽는 사이에 들어온 알림을 놓치지 않음
+                events = self.after(last)
+
+                if events is None:
+                    with self.lock:
+                        last = self.seq
+
+                    yield f'id: {last}\nevent: reset\ndata: {{"seq":{last}}}\n\n'.encode()
+                elif events:
+                    last = events[-1][0]
+                    yield "".join(f"id: {seq}\nevent: {kind}\ndata: {data}\n\n" for seq, kind, data in events).encode()
+                else:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), self.HEARTBEAT)
+                    except asyncio.TimeoutError:
+                        yield b": ping\n\n"
+        finally:
+            with self.lock:
+                self.waiters.discard(waiter)
+
+
+SEED_ITEMS = [
+    Item(name="사과", price=1500, in_stock=True, description="굉장한 사과"),
+    Item(name="바나나", price=800, in_stock=False, description="매우긴 바나나"),
+    Item(name="포도", price=4500, in_stock=True, description=None),
+]
+
+fake_db = make_store()
+
+fake_db.seed(SEED_ITEMS)
+
+
+response_cache = ResponseCache(int(os.environ.get("ITEM_CACHE_BYTES", 64 * 1024 * 1024)), fake_db.refresh)
+fake_db.subscribe(response_cache.on_change)
+
+single_flight = SingleFlight()
+
+search_index = SearchIndex()
+search_index.build(fake_db.values())
+fake_db.subscribe(search_index.on_change)
+
+order_db = make_order_store(fake_db)
+
+# 다른 워커가 바꿀 수 있는 저장소(shared)만 기다리는 동안 확인
+change_feed = ChangeFeed(
+    int(os.environ.get("ITEM_CHANGE_BUFFER", 10_000)), fake_db.refresh if isinstance(fake_db, SharedStore) else None
+)
+fake_db.subscribe(change_feed.on_change)
+
+catalog_stats = CatalogStats()
+catalog_stats.build(fake_db.values())
+fake_db.subscribe(catalog_stats.on_change)
+
+
+def etag_of(_version: int, _suffix: str = "") -> str:
+    return f'"{_version}{_suffix}"'
+
+
+def parse_etags(_header: Optional[str], _suffix: Optional[str] = None) -> Optional[set[int]]:
+    """If-Match / If-None-Match 헤더를 버전 집합으로 바꾸기, 헤더가 없거나 "*" 이면 None
+
+    _suffix 를 주면 그 형식(etag_suffix)의 ETag 만, None 이면 형식과 상관없이 버전만 봄
+    """
+    if _header is None or _header.strip() == "*":
+        return None
+
+    versions = set()
+
+    for tag in _header.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        version, dash, suffix = tag.partition("-")
+
+        if version.isdigit() and (_suffix is None or dash + suffix == _suffix):
+            versions.add(int(version))
+
+    return versions
+
+
+def item_response(
+    _request: Request, _serializer: ItemSerializer, _body: bytes, _version: int, _headers: Optional[dict] = None
+) -> Response:
+    """ETag, Last-Modified 를 붙인 응답, 클라이언트가 이미 같은 버전을 가지고 있으면 본문 없이 304
+
+    Response 를 바로 돌려주면 FastAPI 는 response_model 검증/직렬화를 건너뜀
+    """
+    # 버전이 마이크로초 단위 시각이라 그대로 Last-Modified 로 쓸 수 있음
+    headers = {
+        "ETag": etag_of(_version, _serializer.etag_suffix),
+        "Last-Modified": formatdate(_version / 1_000_000, usegmt=True),
+        "Vary": "Accept",  # 같은 주소라도 Accept 에 따라 다른 형식이라 중간 캐시가 섞지 않도록
+        **(_headers or {}),
+    }
+    if_none_match = _request.headers.get("if-none-match")
+    if_modified_since = _request.headers.get("if-modified-since")
+
+    if if_none_match is not None:
+        # If-None-Match 가 있으면 If-Modified-Since 는 무시 (RFC 9110)
+        known = parse_etags(if_none_match, _serializer.etag_suffix)
+
+        if known is None or _version in known:
+            return Response(status_code=304, headers=headers)
+    elif if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            since = None
+
+        if since is not None and _version // 1_000_000 <= since:
+            return Response(status_code=304, headers=headers)
+
+    return Response(_body, media_type=_serializer.media_type, headers=headers)
+
+
+def not_acceptable(_formats: dict[str, ItemSerializer] = SERIALIZERS) -> HTTPException:
+    return HTTPException(status_code=406, detail=f"지원하는 형식: {', '.join(_formats)}")
+
+
+class AdmissionLimit(BaseModel):
+    """경로 하나의 제한 (ITEM_ADMISSION 환경변수에 {"GET /items": {...}} 형태의 JSON 으로 지정)"""
+    concurrency: Optional[int] = None  # 이 경로를 동시에 처리하는 최대 수, None 이면 전체 제한만
+    queue: int = 64  # concurrency 가 찼을 때 기다릴 수 있는 요청 수
+    rate: Optional[float] = None  # 이 경로 전체의 초당 요청 수 (토큰 버킷)
+    burst: int = 20  # rate 를 넘어서 한번에 받아줄 수 있는 요청 수
+    exempt: bool = False  # 전체 동시 처리 제한에서 빼기 (SSE 처럼 계속 열려 있는 연결)
+
+
+class TokenBucket:
+    """초당 rate 개씩 토큰이 차고 최대 burst 개까지 쌓임, 요청마다 하나씩 씀"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, _rate: float, _burst: int) -> None:
+        self.rate = _rate
+        self.burst = _burst
+        self.tokens = float(_burst)
+        self.updated = time.monotonic()
+
+    def take(self, _now: float) -> float:
+        """토큰을 하나 쓰고 0, 없으면 다음 토큰까지 기다려야 하는 시간(초)"""
+        self.tokens = min(self.burst, self.tokens + (_now - self.updated) * self.rate)
+        self.updated = _now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+
+            return 0.0
+
+        return (1 - self.tokens) / self.rate
+
+
+class ConcurrencyLimiter:
+    """동시에 limit 개까지만 처리하고 나머지는 우선순위 큐에서 기다리게 하기
+
+    - 큐는 (우선순위, 도착 순서) 힙이라 자리가 나면 쓰기(0)가 읽기(1)보다 먼저 들어감
+    - 큐가 꽉 찼을 때 새 요청이 더 급하면 큐에서 가장 덜 급하고 가장 늦게 온 요청을 내보냄 (shed)
+    - timeout 동안 자리가 안 나면 포기 - 기다리는 시간에 상한이 있어서 받아준 요청의 지연도 제한됨
+    - 이벤트 루프에서만 사용해서 락 대신 asyncio Future 로 기다림
+    """
+
+    def __init__(self, _limit: int, _max_queue: int, _timeout: float) -> None:
+        self.limit = _limit
+        self.max_queue = _max_queue
+        self.timeout = _timeout
+        self.active = 0
+        self.queue: list[tuple[int, int, asyncio.Future]] = []
+        self.arrivals = 0
+
+    async def acquire(self, _priority: int) -> Optional[str]:
+        """자리를 얻으면 None, 못 얻으면 거절 이유"""
+        if self.active < self.limit and not self.queue:
+            self.active += 1
+
+            return None
+
+        if len(self.queue) >= self.max_queue:
+            victim = max(self.queue, default=None)  # 가장 덜 급하고 가장 늦게 온 요청
+
+            if victim is None or victim[0] <= _priority:
+                return "queue_full"
+
+            self._discard(victim)
+
+            if not victim[2].done():
+                victim[2].set_result(False)
+
+        self.arrivals += 1
+        entry = (_priority, self.arrivals, asyncio.get_running_loop().create_future())
+        heapq.heappush(self.queue, entry)
+
+        try:
+            granted = await asyncio.wait_for(entry[2], self.timeout)
+        except asyncio.TimeoutError:
+            self._give_up(entry)
+
+            return "timeout"
+        except BaseException:
+            self._give_up(entry)  # 클라이언트가 끊어서 취소된 경우
+            raise
+
+        return None if granted else "shed"
+
+    def release(self) -> None:
+        """자리를 기다리던 요청에게 그대로 넘기고, 없으면 비우기"""
+        while self.queue:
+            _, _, future = heapq.heappop(self.queue)
+
+            if not future.done():
+                future.set_result(True)
+
+                return
+
+        self.active -= 1
+
+    def _give_up(self, _entry: tuple) -> None:
+        """기다리기를 그만둠, 그 순간 자리를 막 넘겨받았으면 다음 요청에게 다시 넘김"""
+        self._discard(_entry)
+        future = _entry[2]
+
+        if future.done() and not future.cancelled() and future.result():
+            self.release()
+
+    def _discard(self, _entry: tuple) -> None:
+        if _entry in self.queue:
+            self.queue.remove(_entry)
+            heapq.heapify(self.queue)
+
+
+class Admission:
+    """과부하일 때 요청을 빨리 거절해서(load shedding) 받아준 요청의 지연을 지키기
+
+    요청마다 순서대로 확인
+    1. 클라이언트(IP) 별 토큰 버킷, 경로별 토큰 버킷 -> 넘으면 429 + Retry-After(다음 토큰까지)
+    2. 경로별 동시 처리 제한 (설정한 경로만), 전체 동시 처리 제한 -> 자리가 안 나면 503 + Retry-After
+    쓰기(POST/PUT/DELETE)는 우선순위가 높아서 기다리는 순서와 밀어내기에서 대량 목록 읽기보다 먼저
+    """
+
+    WRITE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+    MAX_CLIENTS = 10_000  # 클라이언트별 버킷을 이 수까지만 기억 (오래 안 온 클라이언트부터 지움)
+
+    def __init__(
+        self,
+        _concurrency: int,
+        _queue: int,
+        _timeout: float,
+        _client_rate: Optional[float],
+        _client_burst: int,
+        _routes: dict[str, AdmissionLimit],
+    ) -> None:
+        self.limiter = ConcurrencyLimiter(_concurrency, _queue, _timeout)
+        self.timeout = _timeout
+        self.client_rate = _client_rate
+        self.client_burst = _client_burst
+        self.clients: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.routes = _routes
+        self.route_limiters: dict[str, ConcurrencyLimiter] = {}
+        self.route_buckets: dict[str, TokenBucket] = {}
+        self.rejected: Counter = Counter()
+
+        for key, limit in _routes.items():
+            if limit.concurrency is not None:
+                self.route_limiters[key] = ConcurrencyLimiter(limit.concurrency, limit.queue, _timeout)
+            if limit.rate is not None:
+                self.route_buckets[key] = TokenBucket(limit.rate, limit.burst)
+
+    async def enter(self, _method: str, _path: str, _client: Optional[str]) -> tuple[Optional[Response], list]:
+        """(거절 응답 또는 None, 나갈 때 release 해야 하는 limiter 목록)"""
+        key = f"{_method} {_path}"
+        now = time.monotonic()
+
+        if self.client_rate is not None and _client is not None:
+            bucket = self.clients.get(_client)
+
+            if bucket is None:
+                bucket = self.clients[_client] = TokenBucket(self.client_rate, self.client_burst)
+
+                if len(self.clients) > self.MAX_CLIENTS:
+                    self.clients.popitem(last=False)
+            else:
+                self.clients.move_to_end(_client)
+
+            wait = bucket.take(now)
+
+            if wait:
+                return self.reject(429, "rate_client", wait), []
+
+        bucket = self.route_buckets.get(key)
+
+        if bucket is not None:
+            wait = bucket.take(now)
+
+            if wait:
+                return self.reject(429, "rate_route", wait), []
+
+        priority = 0 if _method in self.WRITE_METHODS else 1
+        limit = self.routes.get(key)
+        limiters = [
+            limiter for limiter in (self.route_limiters.get(key), None if limit and limit.exempt else self.limiter)
+            if limiter is not None
+        ]
+        acquired = []
+
+        try:
+            for limiter in limiters:
+                reason = await limiter.acquire(priority)
+
+                if reason is not None:
+                    self.leave(acquired)
+
+                    return self.reject(503, reason, self.timeout), []
+
+                acquired.append(limiter)
+        except BaseException:
+            # 경로 자리를 잡은 뒤 전체 자리를 기다리다 취소되면(클라이언트가 끊음) 잡은 자리를 돌려줘야 함
+            self.leave(acquired)
+            raise
+
+        return None, acquired
+
+    @staticmethod
+    def leave(_acquired: list) -> None:
+        for limiter in reversed(_acquired):
+            limiter.release()
+
+    def reject(self, _status: int, _reason: str, _retry_after: float) -> Response:
+        self.rejected[_reason] += 1
+
+        return JSONResponse(
+            status_code=_status,
+            content={"detail": "요청이 너무 많습니다" if _status == 429 else "서버가 바쁩니다, 잠시 후 다시 시도해주세요"},
+            headers={"Retry-After": str(max(1, math.ceil(_retry_after)))},
+        )
+
+    def queue_stats(self) -> dict[str, tuple[int, int]]:
+        """limiter 이름 -> (처리 중, 기다리는 중)"""
+        limiters = {"*": self.limiter, **self.route_limiters}
+
+        return {name: (limiter.active, len(limiter.queue)) for name, limiter in limiters.items()}
+
+
+def make_admission() -> Admission:
+    """ITEM_MAX_CONCURRENCY, ITEM_MAX_QUEUE, ITEM_QUEUE_TIMEOUT, ITEM_CLIENT_RATE/BURST, ITEM_ADMISSION 환경변수로 설정"""
+    routes = {
+        "GET /items/changes": AdmissionLimit(exempt=True),
+        "GET /metrics": AdmissionLimit(exempt=True),  # 바쁠 때일수록 지표는 읽을 수 있어야 함
+    }
+
+    for key, limit in json.loads(os.environ.get("ITEM_ADMISSION", "{}")).items():
+        routes[key] = AdmissionLimit.model_validate(limit)
+
+    client_rate = os.environ.get("ITEM_CLIENT_RATE")
+
+    return Admission(
+        int(os.environ.get("ITEM_MAX_CONCURRENCY", 64)),
+        int(os.environ.get("ITEM_MAX_QUEUE", 256)),
+        float(os.environ.get("ITEM_QUEUE_TIMEOUT", 2.0)),
+        None if client_rate is None else float(client_rate),
+        int(os.environ.get("ITEM_CLIENT_BURST", 20)),
+        routes,
+    )
+
+
+admission = make_admission()
+
+
+class AdmissionRoute(APIRoute):
+    """요청을 처리하기 전에 admission 을 통과해야 하는 라우트"""
+
+    async def handle(self, scope, receive, send) -> None:
+        client = scope.get("client")
+        start = time.perf_counter()
+        rejection, acquired = await admission.enter(scope["method"], self.path, client[0] if client else None)
+        timer = handler_timer.get()
+
+        if timer is not None:  # 줄 서서 기다린 시간은 처리 시간과 따로 기록 (MetricsRoute)
+            timer[1] = time.perf_counter() - start
+
+        if rejection is not None:
+            await rejection(scope, receive, send)
+
+            return
+
+        try:
+            await super().handle(scope, receive, send)
+        finally:
+            admission.leave(acquired)
+
+
+class Histogram:
+    """Prometheus 방식의 누적 히스토그램, 구간별 개수만 세기 때문에 기록은 O(log 구간 수)"""
+
+    BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, _seconds: float) -> None:
+        self.counts[bisect_left(self.BUCKETS, _seconds)] += 1
+        self.sum += _seconds
+        self.count += 1
+
+
+class Metrics:
+    """경로(route) 별 요청 수, 처리 시간, 처리 중인 요청 수
+
+    - 라벨의 route 는 실제 주소(/items/3)가 아니라 경로 틀(/items/{item_id}) 이라 종류가 늘어나지 않음
+    - queue: admission 에서 자리가 날 때까지 기다린 시간 (거절된 요청도 기다린 만큼)
+    - total: admission 을 통과한 뒤부터 응답을 다 보낼 때까지 (queue 는 빼고)
+    - handler: 엔드포인트 함수만 실행한 시간
+    - framework: total - handler, 즉 요청 파싱/검증 + 응답 직렬화/전송에 쓴 시간
+    - 기록은 모두 이벤트 루프에서만 해서 락이 필요 없음 (워커 프로세스마다 따로 셈)
+    """
+
+    def __init__(self) -> None:
+        self.total: dict[tuple[str, str, int], Histogram] = {}
+        self.handler: dict[tuple[str, str], Histogram] = {}
+        self.framework: dict[tuple[str, str], Histogram] = {}
+        self.queue: dict[tuple[str, str], Histogram] = {}
+        self.in_flight: dict[tuple[str, str], int] = {}
+        self.gauges: list[tuple[str, str, Callable[[], dict[tuple, float]], str]] = []
+
+    def register_gauge(
+        self, _name: str, _help: str, _collect: Callable[[], dict[tuple, float]], _type: str = "gauge"
+    ) -> None:
+        """/metrics 를 읽을 때마다 collect() 를 불러서 {((라벨, 값), ...): 값} 을 내보내기, 누적값이면 _type 을 "counter" 로"""
+        self.gauges.append((_name, _help, _collect, _type))
+
+    def observe(self, _method: str, _route: str, _status: int, _total: float, _handler: float, _queue: float = 0.0) -> None:
+        key = (_method, _route)
+        histogram = self.total.get((_method, _route, _status))
+
+        if histogram is None:
+            histogram = self.total[(_method, _route, _status)] = Histogram()
+            self.handler.setdefault(key, Histogram())
+            self.framework.setdefault(key, Histogram())
+            self.queue.setdefault(key, Histogram())
+
+        histogram.observe(_total)
+        self.handler[key].observe(_handler)
+        self.framework[key].observe(max(_total - _handler, 0.0))
+        self.queue[key].observe(_queue)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+        lines = [
+            "# HELP http_requests_total 처리한 요청 수",
+            "# TYPE http_requests_total counter",
+        ]
+
+        for (method, route, status), histogram in sorted(self.total.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {histogram.count}')
+
+        lines += [
+            "# HELP http_requests_in_flight 지금 처리 중인 요청 수",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+
+        for (method, route), count in sorted(self.in_flight.items()):
+            lines.append(f'http_requests_in_flight{{method="{method}",route="{route}"}} {count}')
+
+        for name, help_text, histograms in (
+            ("http_request_duration_seconds", "요청 전체 처리 시간", self.total),
+            ("http_handler_duration_seconds", "엔드포인트 함수 실행 시간", self.handler),
+            ("http_framework_duration_seconds", "요청 검증 + 응답 직렬화/전송 시간", self.framework),
+            ("http_admission_wait_seconds", "admission 대기열에서 기다린 시간", self.queue),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+
+            for key, histogram in sorted(histograms.items()):
+                labels = f'method="{key[0]}",route="{key[1]}"' + (f',status="{key[2]}"' if len(key) > 2 else "")
+                cumulative = 0
+
+                for le, count in zip((*Histogram.BUCKETS, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        for name, help_text, collect, metric_type in self.gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+
+            for labels, value in sorted(collect().items()):
+                label_text = ",".join(f'{label}="{label_value}"' for label, label_value in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+# 요청마다 [엔드포인트 실행 시간, admission 대기 시간] 을 적는 칸
+handler_timer: ContextVar[Optional[list[float]]] = ContextVar("handler_timer", default=None)
+
+
+class MetricsRoute(AdmissionRoute):
+    """모든 경로에 측정을 붙이는 라우트 클래스 (app.router.route_class 로 지정)
+
+    AdmissionRoute 를 상속해서 admission 에서 거절된 요청(429/503)도 함께 기록됨
 
+    미들웨어는 어느 경로로 갈지 정해지기 전에 실행돼서 경로 틀을 알려면 한 번 더 찾아야 하지만,
+    라우트는 이미 자기 경로를 알고 있어서 요청마다 추가 비용이 perf_counter 몇 번과 dict 조회 정도
+    """
 
-app = FastAPI()
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        super().__init__(path, self.timed(endpoint), **kwargs)
 
-fake_db: dict[int, ItemResponse] = {
-    1: ItemResponse(id=1, name="사과", price=1500, in_stock=True, description="굉장한 사과"),
-    2: ItemResponse(id=2, name="바나나", price=800, in_stock=False, description="매우긴 바나나"),
-    3: ItemResponse(id=3, name="포도", price=4500, in_stock=True, description=None),
-}
+    @staticmethod
+    def timed(_endpoint: Callable) -> Callable:
+        """엔드포인트 실행 시간을 handler_timer 에 적는 함수로 감싸기, def/async def 는 그대로 유지"""
+        if inspect.iscoroutinefunction(_endpoint):
+            @functools.wraps(_endpoint)
+            async def endpoint(*args, **kwargs):
+                timer = handler_timer.get()
+                start = time.perf_counter()
 
-next_id = 4
+                try:
+                    return await _endpoint(*args, **kwargs)
+                finally:
+                    if timer is not None:
+                        timer[0] = time.perf_counter() - start
+
+            return endpoint
+
+        @functools.wraps(_endpoint)
+        def endpoint(*args, **kwargs):
+            # 스레드풀에서 실행되지만 contextvar 는 복사돼서 넘어오므로 같은 리스트에 적힘
+            timer = handler_timer.get()
+            start = time.perf_counter()
+
+            try:
+                return _endpoint(*args, **kwargs)
+            finally:
+                if timer is not None:
+                    timer[0] = time.perf_counter() - start
+
+        return endpoint
+
+    async def handle(self, scope, receive, send) -> None:
+        method = scope["method"]
+        key = (method, self.path)
+        status = 500  # 응답을 시작하기 전에 예외가 나면 500
+        timer = [0.0, 0.0]
+
+        async def send_and_record_status(_message) -> None:
+            nonlocal status
+
+            if _message["type"] == "http.response.start":
+                status = _message["status"]
+
+            await send(_message)
+
+        metrics.in_flight[key] = metrics.in_flight.get(key, 0) + 1
+        token = handler_timer.set(timer)
+        start = time.perf_counter()
+
+        try:
+            await super().handle(scope, receive, send_and_record_status)
+        finally:
+            elapsed = time.perf_counter() - start - timer[1]  # admission 을 통과한 뒤부터
+            handler_timer.reset(token)
+            metrics.in_flight[key] -= 1
+            metrics.observe(method, self.path, status, elapsed, timer[0], timer[1])
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    fake_db.close()  # 서버가 꺼질 때 남은 로그를 디스크에 기록
+    order_db.close()
+
+
+app = FastAPI(lifespan=lifespan)
+app.router.route_class = MetricsRoute  # 아래에서 만드는 모든 경로에 측정을 붙임
+
+
+@app.exception_handler(ItemTooLarge)
+def item_too_large(_request: Request, _e: ItemTooLarge):
+    return JSONResponse(status_code=413, content={"detail": str(_e)})
+
+
+def finite_json(_value):
+    """nan, inf 를 문자열로 바꾼 사본, JSON 에는 nan, inf 가 없어서 그대로 응답하면 인코딩에서 500 이 남"""
+    if isinstance(_value, float) and not math.isfinite(_value):
+        return str(_value)
+    if isinstance(_value, dict):
+        return {key: finite_json(value) for key, value in _value.items()}
+    if isinstance(_value, (list, tuple)):
+        return [finite_json(value) for value in _value]
+
+    return _value
+
+
+@app.exception_handler(RequestValidationError)
+def request_validation_error(_request: Request, _e: RequestValidationError):
+    # 기본 422 처리와 같지만, 거절한 입력(input)에 있는 nan, inf 는 문자열로
+    return JSONResponse(status_code=422, content={"detail": finite_json(jsonable_encoder(_e.errors()))})
+
+
+STREAM_CHUNK = 500  # 스트리밍할 때 저장소에서 한번에 꺼내서 보내는 아이템 수
+
+
+def encode_cursor(_sort: str, _order: str, _item: ItemResponse) -> str:
+    """마지막으로 보낸 아이템의 (정렬키, id) 를 클라이언트가 그대로 돌려보낼 문자열로, 내용은 신경쓰지 않아도 되도록"""
+    raw = json.dumps([_sort, _order, getattr(_item, _sort), _item.id], separators=(",", ":")).encode()
+
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(_cursor: str, _sort: str, _order: str) -> tuple:
+    """cursor -> (정렬키, id), 망가졌거나 다른 정렬로 만든 cursor 면 400"""
+    try:
+        sort, order, key, item_id = json.loads(base64.urlsafe_b64decode(_cursor + "=" * (-len(_cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다")
+
+    if (sort, order) != (_sort, _order) or not isinstance(item_id, int) or not isinstance(key, (int, float)):
+        raise HTTPException(status_code=400, detail="cursor 를 만들 때와 정렬(sort, order)이 다릅니다")
+
+    return key, item_id
+
+
+def stream_items(
+    _sort: str, _order: str, _in_stock: Optional[bool], _offset: int, _limit: Optional[int], _after: Optional[tuple] = None
+) -> Iterator[bytes]:
+    """STREAM_CHUNK 개씩 꺼내서 NDJSON 으로 보내기, 메모리에는 항상 한 묶음만 올라감
+
+    다음 묶음은 마지막으로 보낸 (정렬키, id) 뒤에서부터 이어서 읽기 때문에
+    몇번째 묶음이든 같은 비용이고, 도중에 아이템이 추가/삭제돼도 건너뛰거나 중복되지 않음
+    """
+    remaining = _limit
+    size = STREAM_CHUNK if remaining is None else min(STREAM_CHUNK, remaining)
+
+    if _after is None:
+        chunk = fake_db.page(_sort, _order, _in_stock, _offset, size)
+    else:
+        chunk = fake_db.page_after(_sort, _order, _in_stock, _after, size)
+
+    while chunk:
+        # 저장소의 아이템은 이미 검증된 ItemResponse 라서 바로 JSON 으로
+        yield NDJSON.encode_list(chunk)
+
+        if remaining is not None:
+            remaining -= len(chunk)
+
+        if len(chunk) < size or remaining == 0:
+            return
+
+        last = chunk[-1]
+        size = STREAM_CHUNK if remaining is None else min(STREAM_CHUNK, remaining)
+        chunk = fake_db.page_after(_sort, _order, _in_stock, (getattr(last, _sort), last.id), size)
 
 
 @app.get("/items", response_model=list[ItemResponse])
-def get_items():
-    return list(fake_db.values())
+def get_items(
+    request: Request,
+    in_stock: Optional[bool] = None,
+    sort: Literal["id", "price"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    accept: Optional[str] = Header(None),
+):
+    # 인덱스에서 필요한 페이지만 꺼내오기 때문에 O(log n + limit)
+    offset = 0 if limit is None else (page - 1) * limit
+
+    # cursor 가 있으면 page 대신 그 아이템 바로 다음부터 (keyset 페이지네이션)
+    # 몇 번째 페이지든 이진 탐색(SQLite 는 인덱스 탐색) 한 번이라 비용이 같고, 중간에 추가/삭제돼도 건너뛰거나 겹치지 않음
+    after = None if cursor is None else decode_cursor(cursor, sort, order)
+
+    serializer = NDJSON if stream else negotiate(accept, True)
+
+    if serializer is None:
+        raise not_acceptable(STREAM_SERIALIZERS)
+
+    # ?stream=true 또는 Accept 에서 application/x-ndjson 의 q 값이 가장 높으면 한 줄에 하나씩 조금씩 보내기
+    if serializer is NDJSON:
+        return StreamingResponse(stream_items(sort, order, in_stock, offset, limit, after), media_type=NDJSON.media_type)
+
+    key = ("page", sort, order, in_stock, offset if after is None else after, limit, serializer.media_type)
+    entry = response_cache.get(key)
+
+    if entry is None:
+        # 저장소를 읽기 전에 기억, 읽는 도중에 바뀌면 ETag 가 옛날 버전이 되어 다음 요청에서 다시 받게 됨
+        generation = response_cache.generation
+
+        def build() -> tuple[bytes, int, Optional[dict]]:
+            version = fake_db.version
+
+            if after is None:
+                items = fake_db.page(sort, order, in_stock, offset, limit)
+            else:
+                items = fake_db.page_after(sort, order, in_stock, after, limit)
+
+            # 한 페이지가 꽉 찼으면 다음 페이지가 있을 수 있으니 X-Next-Cursor 헤더로 이어서 받을 위치를 알려줌
+            headers = {"X-Next-Cursor": encode_cursor(sort, order, items[-1])} if limit is not None and len(items) == limit else None
+            body = serializer.encode_list(items)
+            response_cache.put(key, body, version, generation, headers, frozenset(item.id for item in items))
+
+            return body, version, headers
+
+        # 같은 페이지를 동시에 요청한 다른 스레드가 있으면 그 결과를 같이 씀
+        entry = single_flight.do(key, generation, build)
+
+    return item_response(request, serializer, *entry)
+
+
+@app.post("/items:batch", response_model=list[BatchResult], status_code=201)
+def create_items_batch(items: list[Item]):
+    # 요청 본문 전체가 한번에 검증됨, 하나라도 틀리면 422 (loc 에 몇번째 아이템인지 나옴)
+    return [{"id": new_item.id, "status": 201, "item": new_item} for new_item in fake_db.create_many(items)]
+
+
+@app.put("/items:batch", response_model=list[BatchResult])
+def update_items_batch(items: list[ItemUpdate]):
+    # 이미 검증된 값이라 id 만 떼어낸 Item 을 검증 없이 만들기
+    updates = [(item.id, Item.model_construct(**item.model_dump(exclude={"id"}))) for item in items]
+    results = fake_db.update_many(updates)
+
+    return [
+        {"id": item.id, "status": 200, "item": updated} if updated is not None
+        else {"id": item.id, "status": 404, "detail": "아이템을 찾을 수 없습니다"}
+        for item, updated in zip(items, results)
+    ]
+
+
+@app.delete("/items:batch", response_model=list[BatchResult])
+def delete_items_batch(item_ids: list[int]):
+    results = fake_db.delete_many(item_ids)
+
+    return [
+        {"id": item_id, "status": 200} if removed is not None
+        else {"id": item_id, "status": 404, "detail": "아이템을 찾을 수 없습니다"}
+        for item_id, removed in zip(item_ids, results)
+    ]
+
+
+IMPORT_CHUNK = 1000       # 이만큼 모일때마다 create_many 로 저장
+IMPORT_MAX_ERRORS = 100   # 응답에 담을 에러의 최대 개수
+
+
+@app.post(
+    "/items:import",
+    response_model=ImportResult,
+    status_code=201,
+    openapi_extra={"requestBody": {"content": {"application/x-ndjson": {"schema": {"type": "string"}}}}},
+)
+async def import_items(request: Request):
+    """NDJSON(한 줄에 아이템 하나) 본문을 조금씩 읽으면서 저장, 본문 전체를 메모리에 올리지 않음"""
+    created = 0
+    failed = 0
+    errors = []
+    chunk: list[Item] = []
+    line_no = 0
+    buffer = b""
+
+    async def add_line(line: bytes):
+        nonlocal created, failed, chunk, line_no
+        line_no += 1
+
+        if line.strip():
+            try:
+                chunk.append(Item.model_validate_json(line))
+            except ValidationError as e:
+                failed += 1
+
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({"line": line_no, "detail": finite_json(e.errors(include_url=False, include_context=False))})
+
+        if len(chunk) >= IMPORT_CHUNK:
+            created += len(await run_in_threadpool(fake_db.create_many, chunk))
+            chunk = []
+
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            await add_line(line)
+
+    await add_line(buffer)  # 마지막 줄에 줄바꿈이 없는 경우
+
+    if chunk:
+        created += len(await run_in_threadpool(fake_db.create_many, chunk))
+
+    return {"created": created, "failed": failed, "errors": errors}
+
+
+# /items/{item_id} 보다 먼저 등록해야 "search" 를 id 로 읽으려다 422 가 나지 않음
+@app.get("/items/search", response_model=list[ItemResponse])
+def search_items(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    accept: Optional[str] = Header(None),
+):
+    serializer = negotiate(accept)
+
+    if serializer is None:
+        raise not_acceptable()
+
+    fake_db.refresh()  # 다른 워커의 변경도 색인에 반영
+    item_ids = search_index.search(q, limit)
+    items = fake_db.get_many(item_ids)  # 아이템마다 조회하지 않고 한 번에 (SQLite 는 쿼리 한 번), 순서는 점수 순 그대로
+
+    return Response(
+        serializer.encode_list([items[item_id] for item_id in item_ids if item_id in items]), media_type=serializer.media_type
+    )
+
+
+@app.get("/items/changes")
+async def get_item_changes(since: Optional[int] = Query(None, ge=0), last_event_id: Optional[str] = Header(None)):
+    # text/event-stream 으로 변경 이벤트를 계속 보내기, ?since= 나 Last-Event-ID 의 seq 다음부터 이어받음
+    if since is None and last_event_id is not None and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    return StreamingResponse(
+        change_feed.stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # 프록시가 모아서 보내지 않도록
+    )
+
+
+@app.get("/items/stats")
+def get_item_stats(group_by: Optional[Literal["in_stock"]] = None):
+    fake_db.refresh()
+
+    return catalog_stats.summary(group_by == "in_stock")
 
 
 @app.get("/items/{item_id}", response_model=ItemResponse)
-def get_item(item_id: int):
-    if item_id not in fake_db:
-        raise HTTPException(status_code=404, detail="아이템을 찾을 수 없습니다")
-    
-    return fake_db[item_id]
+def get_item(item_id: int, request: Request, accept: Optional[str] = Header(None)):
+    serializer = negotiate(accept)
+
+    if serializer is None:
+        raise not_acceptable()
+
+    key = ("item", item_id, serializer.media_type)
+    entry = response_cache.get(key)
+
+    if entry is None:
+        generation = response_cache.generation
+        item = fake_db.get(item_id)
+
+        if item is None:
+            raise HTTPException(status_code=404, detail="아이템을 찾을 수 없습니다")
+
+        entry = (serializer.encode_item(item), item.version)
+        response_cache.put(key, *entry, generation)
+
+    return item_response(request, serializer, *entry)
 
 
 @app.post("/items", response_model=ItemResponse, status_code=201)
-def create_item(item: Item):
-    global next_id
+def create_item(item: Item, response: Response):
+    new_item = fake_db.create(item)
+    response.headers["ETag"] = etag_of(new_item.version)
 
-    new_item = ItemResponse(id=next_id, **item.model_dump())
-    fake_db[next_id] = new_item
-    next_id += 1
-    
     return new_item
 
 
 @app.put("/items/{item_id}", response_model=ItemResponse)
-def update_item(item_id: int, item: Item):
-    if item_id not in fake_db:
+def update_item(item_id: int, item: Item, response: Response, if_match: Optional[str] = Header(None)):
+    # If-Match: "버전" 을 보내면 그 버전일 때만 수정 (낙관적 동시성 제어), 다르면 412
+    try:
+        updated = fake_db.update(item_id, item, parse_etags(if_match))
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="다른 요청이 먼저 아이템을 수정했습니다")
+
+    if updated is None:
         raise HTTPException(status_code=404, detail="아이템을 찾을 수 없습니다")
-    
-    updated = ItemResponse(id=item_id, **item.model_dump())
-    fake_db[item_id] = updated
-    
+
+    response.headers["ETag"] = etag_of(updated.version)
+
     return updated
 
 
 @app.delete("/items/{item_id}")
-def delete_item(item_id: int):
-    if item_id not in fake_db:
+def delete_item(item_id: int, if_match: Optional[str] = Header(None)):
+    try:
+        removed = fake_db.delete(item_id, parse_etags(if_match))
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="다른 요청이 먼저 아이템을 수정했습니다")
+
+    if removed is None:
         raise HTTPException(status_code=404, detail="아이템을 찾을 수 없습니다")
     
-    del fake_db[item_id]
-    
     return {"message": f"아이템 {item_id}번이 삭제되었습니다"}
 
 
+@app.post("/users", response_model=UserResponse, status_code=201)
+def create_user(user: User):
+    return order_db.create_user(user)
+
+
+@app.get("/users/{user_id}", response_model=UserResponse)
+def get_user(user_id: int):
+    user = order_db.get_user(user_id)
+
+    if user is None:
+        raise HTTPException(status_code=404, detail="유저를 찾을 수 없습니다")
+
+    return user
+
+
+@app.post("/users/{user_id}/orders", response_model=OrderResponse, status_code=201)
+def create_order(user_id: int, order: Order):
+    result = order_db.create_order(user_id, order)
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="유저를 찾을 수 없습니다")
+
+    if isinstance(result, list):
+        raise HTTPException(status_code=422, detail=f"없는 아이템입니다: {result}")
+
+    return result
+
+
+@app.get("/users/{user_id}/orders", response_model=list[OrderResponse])
+def get_user_orders(user_id: int, page: int = Query(1, ge=1), limit: int = Query(20, ge=1, le=100)):
+    orders = order_db.user_order_list(user_id, (page - 1) * limit, limit)
+
+    if orders is None:
+        raise HTTPException(status_code=404, detail="유저를 찾을 수 없습니다")
+
+    return orders
+
+
+@app.get("/users/{user_id}/orders/{order_id}", response_model=OrderResponse)
+def get_user_order(user_id: int, order_id: int):
+    order = order_db.user_order(user_id, order_id)
+
+    if order is None:
+        raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다")
+
+    return order
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    return response_cache.stats()
+
+
+metrics.register_gauge(
+    "items_cache",
+    "응답 캐시 상태 (hits, misses, evictions, entries, bytes)",
+    lambda: {(("stat", name),): value for name, value in response_cache.stats().items() if name != "max_bytes"},
+)
+
+
+metrics.register_gauge(
+    "items_single_flight",
+    "같은 목록 요청 합치기 (leaders: 직접 계산, followers: 결과를 같이 받음, in_flight: 진행 중)",
+    lambda: {(("stat", name),): value for name, value in single_flight.stats().items()},
+)
+
+
+metrics.register_gauge(
+    "http_admission_active",
+    "admission 을 통과해서 처리 중인 요청 수 (limiter=\"*\" 는 전체)",
+    lambda: {(("limiter", name),): active for name, (active, _) in admission.queue_stats().items()},
+)
+metrics.register_gauge(
+    "http_admission_queue_depth",
+    "자리가 나기를 기다리는 요청 수",
+    lambda: {(("limiter", name),): depth for name, (_, depth) in admission.queue_stats().items()},
+)
+metrics.register_gauge(
+    "http_admission_rejected_total",
+    "거절한 요청 수 (rate_client, rate_route: 429 / queue_full, timeout, shed: 503)",
+    lambda: {(("reason", reason),): count for reason, count in admission.rejected.items()},
+    "counter",
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    # async def 라서 이벤트 루프에서 실행됨, 기록하는 쪽과 같은 스레드라 읽는 도중에 dict 가 바뀌지 않음
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
 
 
 """
+ITEM_STORE=log uvicorn backend1-1:app     # 디스크에 저장하는 저장소로 실행 (기본은 memory)
+ITEM_STORE=sqlite uvicorn backend1-1:app  # SQLite 저장소로 실행
+ITEM_STORE=shared ITEM_STORE_PATH=/dev/shm/items uvicorn backend1-1:app --workers 4  # 워커 4개가 한 카탈로그를 공유
+# memory 가 아니면 유저/주문은 ITEM_STORE_PATH 의 SQLite 에 저장, 재시작해도 남고 모든 워커가 같은 id 를 씀
+ITEM_CLIENT_RATE=50 ITEM_ADMISSION='{"GET /items": {"concurrency": 8, "queue": 16}}' uvicorn backend1-1:app  # 과부하 때 429/503 으로 빨리 거절
+python bench_store.py -n 1000000          # 쓰기 속도와 재시작 복구 시간 측정
+python bench_load.py --store sqlite --sizes 1000,100000 --concurrency 1,32  # 부하 테스트, 경로별 p50/p95/p99
+python bench_serializers.py -n 10000      # 형식별 응답 크기와 인코딩 시간 비교
+
 http://localhost:8000/docs
 curl http://localhost:8000/items
 curl http://localhost:8000/items/1
+curl http://localhost:8000/items/1 -H "Accept: application/msgpack" --output item.msgpack  # 바이너리 형식
 curl http://localhost:8000/items/999
 curl -X POST http://localhost:8000/items -H "Content-Type: application/json" -d '{"name": "딸기", "price": 6000, "in_stock": true, "description": "엄청난 딸기"}'
 curl -X PUT http://localhost:8000/items/1 -H "Content-Type: application/json" -d '{"name": "수정된 사과", "price": 2000, "in_stock": false}'
 curl -X DELETE http://localhost:8000/items/2
+curl -X POST http://localhost:8000/items:batch -H "Content-Type: application/json" -d '[{"name": "키위", "price": 3000}, {"name": "배", "price": 5000}]'
+curl -X PUT http://localhost:8000/items:batch -H "Content-Type: application/json" -d '[{"id": 1, "name": "사과", "price": 1000}, {"id": 999, "name": "없음", "price": 1}]'
+curl -X DELETE http://localhost:8000/items:batch -H "Content-Type: application/json" -d '[3, 999]'
+curl -X POST http://localhost:8000/items:import -H "Content-Type: application/x-ndjson" --data-binary @items.ndjson
+curl "http://localhost:8000/items?in_stock=true&sort=price&order=desc&page=1&limit=2"
+curl -i "http://localhost:8000/items?sort=price&limit=2"                  # 응답 헤더의 X-Next-Cursor 를
+curl -i "http://localhost:8000/items?sort=price&limit=2&cursor=받은값"     # 그대로 넘기면 다음 페이지
+curl -N http://localhost:8000/items -H "Accept: application/x-ndjson"
+curl -X POST http://localhost:8000/users -H "Content-Type: application/json" -d '{"name": "철수"}'
+curl -X POST http://localhost:8000/users/1/orders -H "Content-Type: application/json" -d '{"lines": [{"item_id": 1, "quantity": 3}, {"item_id": 3}]}'
+curl http://localhost:8000/users/1/orders
+curl http://localhost:8000/users/1/orders/1
+curl http://localhost:8000/cache/stats
+curl http://localhost:8000/metrics      # 경로별 요청 수, 처리 시간 히스토그램 (Prometheus 형식)
+curl "http://localhost:8000/items/search?q=사과"
+curl "http://localhost:8000/items/stats?group_by=in_stock"
+curl -N http://localhost:8000/items/changes -H "Last-Event-ID: 0"  # 변경 이벤트 스트림 (SSE)
+curl -i http://localhost:8000/items/1 -H 'If-None-Match: "버전"'     # 바뀌지 않았으면 304
+curl -X PUT http://localhost:8000/items/1 -H 'If-Match: "버전"' -H "Content-Type: application/json" -d '{"name": "사과", "price": 1000}'
 
 # 생각해보기
 
@@ -0,0 +1,17 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def load_backend(_name: str = "backend"):
+    """파일 이름에 - 가 있어서 import 문으로는 못 불러오기 때문에 직접 불러오기, 부를 때마다 새 모듈(새 저장소)
+
+    저장소는 불러올 때 ITEM_STORE, ITEM_STORE_PATH 환경변수로 정해지므로 먼저 설정하고 부름
+    """
+    path = Path(__file__).with_name("backend1-1.py")
+    spec = importlib.util.spec_from_file_location(_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[_name] = module
+    spec.loader.exec_module(module)
+
+    return module
@@ -0,0 +1,251 @@
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from bench_common import load_backend
+
+
+def make_async_app(_app: FastAPI) -> FastAPI:
+    """같은 라우트를 async def 핸들러로 감싼 앱
+
+    def 핸들러는 스레드풀에서, async def 핸들러는 이벤트 루프에서 바로 실행됨
+    저장소 작업이 짧으면 스레드 전환 비용이 없는 async 가 빠르고, 길면 루프를 막아서 느려짐
+    라우트 클래스(측정, admission)도 원래 앱과 같은 것을 써야 비교가 공평함
+    """
+    app = FastAPI()
+    app.router.route_class = _app.router.route_class
+
+    for route in _app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+
+        endpoint = route.endpoint
+
+        if not inspect.iscoroutinefunction(endpoint):
+            def bind(_sync_endpoint):
+                async def endpoint(*args, **kwargs):
+                    return _sync_endpoint(*args, **kwargs)
+
+                # functools.wraps 를 쓰면 FastAPI 가 원래 함수를 보고 동기 함수로 취급할 수 있어서 서명만 복사
+                endpoint.__signature__ = inspect.signature(_sync_endpoint)
+                endpoint.__name__ = _sync_endpoint.__name__
+
+                return endpoint
+
+            endpoint = bind(endpoint)
+
+        app.add_api_route(
+            route.path,
+            endpoint,
+            methods=list(route.methods),
+            response_model=route.response_model,
+            status_code=route.status_code,
+        )
+
+    app.exception_handlers.update(_app.exception_handlers)
+    app.user_middleware = list(_app.user_middleware)
+
+    return app
+
+
+async def call(_app, _method: str, _path: str, _query: str = "", _body: bytes = b"") -> int:
+    """네트워크 없이 ASGI 앱을 직접 호출하고 상태 코드를 반환"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": _method,
+        "scheme": "http",
+        "path": _path,
+        "raw_path": _path.encode(),
+        "query_string": _query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    done = asyncio.Event()
+    body_sent = False
+    status = 0
+
+    async def receive():
+        nonlocal body_sent
+
+        if not body_sent:
+            body_sent = True
+
+            return {"type": "http.request", "body": _body, "more_body": False}
+
+        await done.wait()  # 응답이 끝날 때까지 연결이 살아있는 것처럼
+
+        return {"type": "http.disconnect"}
+
+    async def send(_message):
+        nonlocal status
+
+        if _message["type"] == "http.response.start":
+            status = _message["status"]
+        elif _message["type"] == "http.response.body" and not _message.get("more_body", False):
+            done.set()
+
+    await _app(scope, receive, send)
+    done.set()
+
+    return status
+
+
+async def check_non_finite(_app) -> None:
+    """nan, inf 가격은 저장하지 않고 422 로 거절해야 함 (거절한 입력을 JSON 으로 못 바꾸면 500 이 남)"""
+    for path, body in (
+        ("/items", b'{"name": "nan", "price": NaN}'),
+        ("/items", b'{"name": "inf", "price": Infinity}'),
+        ("/items:batch", b'[{"name": "nan", "price": NaN}]'),
+        ("/items:batch", b'[{"name": "ok", "price": 1000}, {"name": "inf", "price": -Infinity}]'),
+    ):
+        status = await call(_app, "POST", path, "", body)
+        assert status == 422, f"POST {path} {body.decode()} -> {status}"
+
+
+def parse_mix(_mix: str) -> dict[str, float]:
+    """"list=60,get=30,create=4,update=3,delete=3" -> {"list": 60.0, ...}"""
+    mix = {}
+
+    for part in _mix.split(","):
+        name, weight = part.split("=")
+        mix[name.strip()] = float(weight)
+
+    return mix
+
+
+def percentile(_sorted: list[float], _p: float) -> float:
+    if not _sorted:
+        return 0.0
+
+    return _sorted[min(len(_sorted) - 1, int(len(_sorted) * _p / 100))]
+
+
+async def run(_app, _backend, _mix: dict[str, float], _concurrency: int, _requests: int, _seed: int) -> dict:
+    rng = random.Random(_seed)
+    names = list(_mix)
+    weights = list(_mix.values())
+    plan = rng.choices(names, weights, k=_requests)
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    statuses: dict[str, dict[int, int]] = {name: {} for name in names}
+    body = json.dumps({"name": "벤치 아이템", "price": 1000, "in_stock": True, "description": "부하 테스트"}).encode()
+    cursor = 0
+
+    def request(_name: str) -> tuple:
+        max_id = max(_backend.fake_db.next_id - 1, 1)
+        item_id = rng.randint(1, max_id)
+
+        if _name == "list":
+            return "GET", "/items", f"limit=50&page={rng.randint(1, 20)}", b""
+        if _name == "sorted":
+            return "GET", "/items", "in_stock=true&sort=price&order=desc&limit=50", b""
+        if _name == "get":
+            return "GET", f"/items/{item_id}", "", b""
+        if _name == "create":
+            return "POST", "/items", "", body
+        if _name == "update":
+            return "PUT", f"/items/{item_id}", "", body
+        if _name == "delete":
+            return "DELETE", f"/items/{item_id}", "", b""
+        if _name == "search":
+            return "GET", "/items/search", "q=%EB%B2%A4%EC%B9%98", b""  # "벤치"
+
+        raise ValueError(f"알 수 없는 요청 종류: {_name}")
+
+    async def worker():
+        nonlocal cursor
+
+        while cursor < len(plan):
+            name = plan[cursor]
+            cursor += 1
+            method, path, query, payload = request(name)
+            start = time.perf_counter()
+            status = await call(_app, method, path, query, payload)
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            statuses[name][status] = statuses[name].get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(_concurrency)))
+    elapsed = time.perf_counter() - start
+
+    routes = {}
+
+    for name in names:
+        values = sorted(latencies[name])
+        routes[name] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "status": statuses[name],
+        }
+
+    return {"throughput_rps": round(_requests / elapsed, 1), "routes": routes}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="items API 를 네트워크 없이(ASGI) 직접 호출하는 부하 테스트")
+    parser.add_argument("--store", default="memory", help="memory, log, sqlite, shared")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="미리 채워둘 카탈로그 크기들")
+    parser.add_argument("--concurrency", default="1,8,32", help="동시에 요청하는 수들")
+    parser.add_argument("--requests", type=int, default=2000, help="한 번 실행할 때의 요청 수")
+    parser.add_argument("--mix", default="list=45,get=45,create=4,update=3,delete=3", help="요청 종류별 비율")
+    parser.add_argument("--modes", default="sync,async", help="sync: 지금의 def 핸들러, async: async def 로 감싼 핸들러")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="결과 JSON 을 저장할 파일")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    results = []
+
+    for size in [int(x) for x in args.sizes.split(",")]:
+        for mode in args.modes.split(","):
+            for concurrency in [int(x) for x in args.concurrency.split(",")]:
+                with tempfile.TemporaryDirectory() as tmp:
+                    # 실행마다 빈 저장소에서 시작
+                    os.environ["ITEM_STORE"] = args.store
+                    os.environ["ITEM_STORE_PATH"] = tmp
+                    backend = load_backend()
+
+                    for start in range(0, size, 10_000):
+                        batch = [
+                            backend.Item(name=f"아이템{i}", price=(i * 7919) % 100_000, in_stock=i % 3 != 0)
+                            for i in range(start, min(start + 10_000, size))
+                        ]
+                        backend.fake_db.create_many(batch)
+
+                    app = backend.app if mode == "sync" else make_async_app(backend.app)
+                    asyncio.run(check_non_finite(app))
+                    result = asyncio.run(run(app, backend, mix, concurrency, args.requests, args.seed))
+                    backend.fake_db.close()
+
+                result = {"store": args.store, "mode": mode, "catalog": size, "concurrency": concurrency, **result}
+                results.append(result)
+                print(
+                    f"{args.store:7} {mode:5} catalog={size:<7} concurrency={concurrency:<3} {result['throughput_rps']:>9} req/s",
+                    file=sys.stderr,
+                )
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+
+    if args.out:
+        Path(args.out).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
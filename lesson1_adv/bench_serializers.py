@@ -0,0 +1,76 @@
+import argparse
+import gzip
+import json
+import time
+
+from pydantic import TypeAdapter
+
+from bench_common import load_backend
+
+
+def best_of(_repeat: int, _encode) -> tuple[float, bytes]:
+    """여러 번 실행해서 가장 빠른 시간(ms)과 결과"""
+    best = float("inf")
+
+    for _ in range(_repeat):
+        start = time.perf_counter()
+        body = _encode()
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="아이템 목록 응답 형식별 크기와 인코딩 시간 비교")
+    parser.add_argument("-n", type=int, default=10_000, help="목록의 아이템 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backend = load_backend()
+    items = [
+        backend.ItemResponse(
+            id=i + 1,
+            name=f"아이템{i}",
+            price=(i * 7919) % 100_000 + 0.5,
+            in_stock=i % 3 != 0,
+            description="설명" if i % 2 else None,
+            version=1_700_000_000_000_000 + i,
+        )
+        for i in range(args.n)
+    ]
+    adapter = TypeAdapter(list[backend.ItemResponse])
+
+    cases = {
+        "pydantic_list": lambda: adapter.dump_json(items),  # TypeAdapter 로 목록 전체
+        "stdlib_json": lambda: json.dumps([item.model_dump() for item in items], separators=(",", ":")).encode(),
+        "json": lambda: backend.ItemSerializer().encode_list(items),
+        "msgpack": lambda: backend.MsgpackSerializer().encode_list(items),
+    }
+
+    if backend.msgpack is not None:
+        # 같은 직렬화기를 순수 파이썬 인코더로도 측정
+        def pure_msgpack():
+            saved, backend.msgpack = backend.msgpack, None
+
+            try:
+                return backend.MsgpackSerializer().encode_list(items)
+            finally:
+                backend.msgpack = saved
+
+        cases["msgpack_pure_python"] = pure_msgpack
+
+    result = {"items": args.n, "msgpack_library": backend.msgpack is not None, "formats": {}}
+
+    for name, encode in cases.items():
+        ms, body = best_of(args.repeat, encode)
+        result["formats"][name] = {
+            "encode_ms": round(ms, 3),
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, 6)),
+        }
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
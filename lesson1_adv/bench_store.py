@@ -0,0 +1,64 @@
+import argparse
+import json
+import tempfile
+import time
+
+from bench_common import load_backend
+
+
+def fill(_store, _items) -> float:
+    """아이템을 모두 넣고 걸린 시간(초)을 반환"""
+    start = time.perf_counter()
+
+    for item in _items:
+        _store.create(item)
+
+    return time.perf_counter() - start
+
+
+def recover(_backend, _path: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    store = _backend.LogStore(_path)
+    elapsed = time.perf_counter() - start
+    count = len(store)
+    store.close()
+
+    return elapsed, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LogStore 쓰기 속도 / 재시작 복구 시간 측정")
+    parser.add_argument("-n", type=int, default=1_000_000, help="아이템 수")
+    args = parser.parse_args()
+
+    backend = load_backend()
+    items = [
+        backend.Item(name=f"아이템{i}", price=(i * 7919) % 100_000, in_stock=i % 3 != 0, description="설명")
+        for i in range(args.n)
+    ]
+    result = {"items": args.n}
+
+    result["memory_write_per_sec"] = args.n / fill(backend.MemoryStore(), items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1. 로그만 있는 상태에서 재시작 (압축이 일어나지 않게 compact_every 를 크게)
+        store = backend.LogStore(tmp, _compact_every=args.n * 10)
+        result["log_write_per_sec"] = args.n / fill(store, items)
+        store.close()
+
+        result["recover_log_only_sec"], count = recover(backend, tmp)
+        assert count == args.n
+
+        # 2. 스냅샷으로 압축한 뒤 재시작
+        store = backend.LogStore(tmp)
+        store.compact()
+        store.close()
+
+        result["recover_snapshot_sec"], count = recover(backend, tmp)
+        assert count == args.n
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,691 @@
+import math
 import sys
+import time
+from collections import deque
 
-from PyQt6.QtCore import Qt, QPointF, QTimer
-from PyQt6.QtGui import QPainter, QBrush, QColor, QMouseEvent
+import numpy as np
+from PyQt6 import sip
+from PyQt6.QtCore import Qt, QPointF, QThread, QTimer
+from PyQt6.QtGui import QPainter, QColor, QImage, QMouseEvent, QPixmap
 from PyQt6.QtWidgets import QApplication, QWidget
 
 
 class Ball:
+    """공 하나의 처음 상태, 실제 계산은 BallWorld 의 배열에서 함"""
     def __init__(self, _radius, _pos, _vel=(0, 0)):
         self.r = _radius
         self.pos = QPointF(float(_pos[0]), float(_pos[1]))  # 위치 (Position)
         self.vel = QPointF(float(_vel[0]), float(_vel[1]))  # 속도 (Velocity)
         self.m = _radius * 2                                # 질량 (Mass)
 
-    def contains(self, _c_pos: QPointF) -> bool:
-        """마우스 커서가 공 안에 있는지 확인"""
-        dx = _c_pos.x() - self.pos.x()
-        dy = _c_pos.y() - self.pos.y()
 
-        return (dx * dx + dy * dy) <= (self.r * self.r)
+class FixedStep:
+    """고정 시간 간격(step) 누적기 (Fixed Timestep Accumulator)
+
+    타이머가 정확히 16ms 마다 온다고 믿고 dt 를 고정하면, 화면이 멈칫할 때 시뮬레이션도 같이 느려짐
+    실제로 흐른 시간(monotonic clock)을 누적해두고 step 만큼씩 꺼내 쓰면 늦게 불려도 시간이 맞음
+    - tick(): 지금까지 쌓인 시간으로 진행해야 할 스텝 수
+    - 한 번에 max_steps 보다 많이 따라잡지 않음 (한 프레임이 느려서 스텝이 더 밀리는 악순환 방지), 넘친 시간은 버림
+    - pause(): 멈춘 동안의 시간은 세지 않음 (다시 시작할 때 몰아서 계산하지 않도록)
+    """
+    def __init__(self, _step=1 / 60, _max_steps=5):
+        self.step = _step
+        self.max_steps = _max_steps
+        self.accumulator = 0.0
+        self.last = None     # 마지막으로 tick 한 시각, None 이면 멈춘 상태
+
+    def tick(self, _now=None):
+        now = time.perf_counter() if _now is None else _now
+
+        if self.last is None: # 멈췄다가 다시 시작하면 이번 시각부터 셈
+            self.last = now
+            return 0
+
+        self.accumulator += now - self.last
+        self.last = now
+
+        steps = int(self.accumulator / self.step)
+
+        if steps > self.max_steps:
+            self.accumulator -= (steps - self.max_steps) * self.step
+            steps = self.max_steps
+
+        self.accumulator = max(self.accumulator - steps * self.step, 0.0) # 남은 시간은 다음 tick 으로
+
+        return steps
+
+    def pause(self):
+        self.last = None
+
+
+class BallWorld:
+    """모든 공의 위치, 속도, 반지름, 질량을 각각 하나의 NumPy 배열에 모아둔 물리 엔진
+
+    공마다 객체를 두고 하나씩 계산하면(Array of Structures) 파이썬 반복문이 공 수만큼 돌지만,
+    같은 값끼리 연속된 배열에 모아두면(Structure of Arrays) 한 번의 배열 연산으로 모든 공을 계산할 수 있음
+    - pos, vel: (n, 2) 배열, i 번째 줄이 i 번째 공의 (x, y)
+    - r, m: (n,) 배열
+    - QApplication 없이도 쓸 수 있어서 창 없이 테스트/벤치마크 가능 (bench_physics.py)
+    - phase_time: 단계별로 걸린 시간(초)의 누적 합
+    - prev_pos: 마지막 advance 직전의 위치, 화면에는 prev_pos 와 pos 사이를 보간해서 그림 (Snapshot)
+
+    잠자기(Sleep), _sleep=True 일 때
+    - 속도가 SLEEP_SPEED 보다 느린 상태로 SLEEP_TIME 초가 지난 공은 잠들고, 잠든 공은 계산에서 빠짐
+    - 서로 닿아있는 공들(섬, Island)은 모두 느려야 같이 잠들고, 깨어날 때도 섬 전체가 같이 깨어남
+    - 빠르게 부딪히거나(wake) 드래그하면 깨어남, 천천히 닿으면 잠든 공은 움직이지 않는 벽처럼 취급
+    - awake: 깨어있는지 (n,) 배열, island: 잠든 공이 속한 섬의 대표 공 번호
+    """
+
+    # 같은 줄에서 옆으로 붙은 칸들은 키도 연속이라 (dy, 왼쪽 dx, 오른쪽 dx) 범위 하나를 이진 탐색 두 번으로 찾음
+    # 옆 칸은 8방향 중 절반만 보면 같은 쌍을 두 번 보지 않음 (자기 칸~오른쪽, 왼쪽 아래~오른쪽 아래)
+    NEIGHBORS = ((0, 0, 1), (1, -1, 1))
+    # 깨어있는 공과 잠든 공처럼 서로 다른 두 묶음 사이에서는 9칸을 모두 봐야 함 (위, 같은, 아래 줄)
+    ALL_NEIGHBORS = ((-1, -1, 1), (0, -1, 1), (1, -1, 1))
+    ROW = 1 << 22    # 칸 (x, y) 를 정수 키 하나로: y * ROW + x, 원점을 고정해서 잠든 공들의 키를 재사용
+    OFFSET = 1 << 20 # 화면 밖(음수 좌표)의 칸도 양수가 되도록
+
+    SLEEP_SPEED = 5.0 # px/s
+    SLEEP_TIME = 0.5  # 초
+    SLEEP_CHECK = 0.1 # 초, 섬 찾기는 비싸서 이 간격마다 한 번만 (그만큼 늦게 잠들 수 있음)
+
+    def __init__(self, _pos, _vel, _r, _elasticity=0.95, _sleep=False, _seed=None):
+        self.pos = np.asarray(_pos, dtype=np.float64).reshape(-1, 2)
+        self.vel = np.asarray(_vel, dtype=np.float64).reshape(-1, 2)
+        self.r = np.asarray(_r, dtype=np.float64)
+        self.m = self.r * 2 # 질량 (Mass), Ball 과 같은 규칙
+        self.elasticity = _elasticity
+        self.rng = np.random.default_rng(_seed) # 충돌 묶음 나누기용, 같은 _seed 면 매번 같은 결과 (회귀 테스트)
+        self.prev_pos = self.pos.copy()
+        self.cell = 2 * self.r.max() if len(self.r) else 1.0 # 공간 해시 칸 크기 = 가장 큰 공의 지름
+        self.phase_time = {"integrate": 0.0, "walls": 0.0, "broadphase": 0.0, "narrowphase": 0.0, "sleep": 0.0}
+
+        n = len(self.r)
+        self.sleep = _sleep
+        self.awake = np.ones(n, dtype=bool)
+        self.still_time = np.zeros(n)     # 느린 상태로 지난 시간(초)
+        self.since_check = 0.0            # 마지막으로 섬을 찾은 뒤 지난 시간(초)
+        self.island = np.arange(n)
+        self.active = slice(None)         # 깨어있는 공들, 모두 깨어있으면 slice 라서 복사 없이 계산
+        self.sleeping_grid = self.grid(np.empty(0, dtype=np.int64)) # 잠든 공들의 (정렬된 칸 키, 공 번호)
+        self.bounds = None
+
+    @classmethod
+    def from_balls(cls, _balls, _elasticity=0.95, _sleep=False):
+        """Ball 목록으로 만들기"""
+        pos = [(b.pos.x(), b.pos.y()) for b in _balls]
+        vel = [(b.vel.x(), b.vel.y()) for b in _balls]
+
+        return cls(pos, vel, [b.r for b in _balls], _elasticity, _sleep)
+
+    @classmethod
+    def random(cls, _n, _width, _height, _elasticity=0.95, _seed=None, _sleep=False):
+        """작은 공 _n 개를 화면에 무작위로 뿌리기 (python 1-3.py 5000 처럼 실행하면 사용)"""
+        rng = np.random.default_rng(_seed)
+        r = rng.uniform(2, 5, _n)
+        pos = np.column_stack((rng.uniform(r, _width - r), rng.uniform(r, _height - r)))
+        vel = rng.uniform(-100, 100, (_n, 2))
+
+        return cls(pos, vel, r, _elasticity, _sleep, _seed)
+
+    def __len__(self):
+        return len(self.r)
+
+    def awake_count(self):
+        return len(self.r) if isinstance(self.active, slice) else len(self.active)
+
+    def moving(self):
+        """계산할 공들, 대부분 깨어있으면 깨어있는 공만 골라내서(복사) 다시 쓰는 것보다 전체를 계산하는 게 빠름
+
+        잠든 공은 속도가 0 이고 벽 안에 멈춰 있어서 같이 계산해도 바뀌지 않음
+        """
+        return self.active if self.awake_count() * 2 < len(self.r) else slice(None)
+
+    def kinetic_energy(self):
+        """전체 운동 에너지 (1/2 m v²) 의 합, 탄성 계수가 1 이면 이 값이 변하지 않아야 정상"""
+        return float(0.5 * np.dot(self.m, np.einsum("ij,ij->i", self.vel, self.vel)))
+
+    def advance(self, _dt, _width, _height, _substeps=1):
+        """고정 스텝 하나를 _substeps 번으로 잘게 나눠서 진행
+
+        빠른 공은 한 스텝에 자기 지름보다 멀리 움직이면 다른 공을 뚫고 지나감(터널링)
+        잘게 나누면 한 번에 움직이는 거리가 줄어서 충돌을 놓치지 않음
+        """
+        self.prev_pos[self.active] = self.pos[self.active] # 잠든 공은 이미 prev_pos == pos
+        dt = _dt / _substeps
+
+        for _ in range(_substeps):
+            self.step(dt, _width, _height)
+
+    def step(self, _dt, _width, _height):
+        """한 스텝 진행: 위치 업데이트 -> 벽 충돌 -> 공-공 충돌 -> 잠들 공 찾기, 깨어있는 공만 계산"""
+        if (_width, _height) != self.bounds: # 화면 크기가 바뀌면 잠든 공이 벽 밖에 있을 수 있음
+            self.bounds = (_width, _height)
+            self.wake(np.arange(len(self.r)))
+
+        if self.awake_count() == 0: # 모두 잠들어 있으면 할 일이 없음
+            return
+
+        t0 = time.perf_counter()
+        active = self.moving()
+        self.pos[active] += self.vel[active] * _dt # 1. 깨어있는 공의 위치를 한 번에 업데이트
+        t1 = time.perf_counter()
+        self.handle_wall_collision(_width, _height, active)
+        t2 = time.perf_counter()
+        pairs = self.find_pairs()
+        t3 = time.perf_counter()
+        contacts = self.handle_ball_collision(pairs)
+        t4 = time.perf_counter()
+        self.update_sleep(_dt, contacts)
+        t5 = time.perf_counter()
+
+        self.phase_time["integrate"] += t1 - t0
+        self.phase_time["walls"] += t2 - t1
+        self.phase_time["broadphase"] += t3 - t2
+        self.phase_time["narrowphase"] += t4 - t3
+        self.phase_time["sleep"] += t5 - t4
+
+    def handle_wall_collision(self, _width, _height, _active=slice(None)):
+        """벽과의 충돌 처리, 벽 밖으로 나간 공만 골라서(마스크) 한 번에 처리, _active: 검사할 공들 (moving)"""
+        e = self.elasticity
+        pos, vel, r = self.pos[_active], self.vel[_active], self.r[_active] # slice 면 복사 없는 view
+
+        for axis, size in ((0, _width), (1, _height)):
+            low = pos[:, axis] - r < 0      # 왼쪽 / 위쪽 벽을 넘은 공들
+            high = pos[:, axis] + r > size  # 오른쪽 / 아래쪽 벽을 넘은 공들
+
+            pos[low, axis] = r[low]
+            pos[high, axis] = size - r[high]
+            vel[low | high, axis] *= -e
+
+        self.pos[_active] = pos
+        self.vel[_active] = vel
+
+    def grid(self, _idx):
+        """공 _idx 들의 칸 키를 정렬한 (정렬된 키, 같은 순서의 공 번호)"""
+        cells = np.floor(self.pos[_idx] / self.cell).astype(np.int64) + self.OFFSET
+        keys = cells[:, 1] * self.ROW + cells[:, 0]
+        order = np.argsort(keys, kind="stable")
+
+        return keys[order], _idx[order]
+
+    def find_pairs(self):
+        """겹칠 수 있는 후보 쌍 (i, j) 배열 - 공간 해시(Spatial Hash)를 배열 연산으로
+
+        1. 가장 큰 공의 지름 크기 칸으로 나누고, 칸 번호를 정수 키 하나로 만들어서 정렬
+        2. 정렬된 키에서 이웃 칸의 범위를 이진 탐색(searchsorted)으로 한 번에 찾음
+        3. 범위들을 (i, j) 쌍 목록으로 펼침
+        잠든 공끼리는 볼 필요가 없어서 깨어있는 공끼리 + 깨어있는 공과 잠든 공만 찾음
+        잠든 공은 안 움직이니 잠든 공들의 정렬된 키(sleeping_grid)는 잠들고 깰 때만 고쳐서 계속 씀
+        대부분 깨어있으면 9칸을 찾는 것보다 모든 공을 한 번에 찾고 잠든 공끼리의 쌍을 빼는 게 빠름
+        """
+        if self.awake_count() * 2 >= len(self.r):
+            keys, idx = self.grid(np.arange(len(self.r)))
+            pairs_i, pairs_j = self.search(keys, idx, keys, idx, self.NEIGHBORS, True)
+
+            if not pairs_i:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+            i, j = np.concatenate(pairs_i), np.concatenate(pairs_j)
+            keep = self.awake[i] | self.awake[j]
+
+            return i[keep], j[keep]
+
+        awake_keys, awake_idx = self.grid(np.arange(len(self.r))[self.active])
+        pairs_i, pairs_j = self.search(awake_keys, awake_idx, awake_keys, awake_idx, self.NEIGHBORS, True)
+        sleeping_keys, sleeping_idx = self.sleeping_grid
+
+        if len(awake_idx) and len(sleeping_idx):
+            i, j = self.search(awake_keys, awake_idx, sleeping_keys, sleeping_idx, self.ALL_NEIGHBORS, False)
+            pairs_i += i
+            pairs_j += j
+
+        if not pairs_i:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+    def search(self, _keys, _idx, _target_keys, _target_idx, _neighbors, _same):
+        """정렬된 _keys 의 공마다 _target_keys 에서 이웃 칸에 있는 공들을 찾아서 쌍 목록으로
+
+        _neighbors: (dy, 왼쪽 dx, 오른쪽 dx) 범위들, 한 줄 안의 칸들은 키가 연속이라 범위 하나로 찾음
+        _same 이면 같은 묶음 안에서 찾는 것이라 자기 줄(dy == 0)에서는 정렬 순서상 뒤에 있는 공만 (같은 쌍을 두 번 보지 않도록)
+        """
+        n = len(_keys)
+        positions = np.arange(n)
+        pairs_i, pairs_j = [], []
+
+        for dy, low, high in _neighbors:
+            row = _keys + dy * self.ROW
+            end = np.searchsorted(_target_keys, row + high, "right")
+
+            if _same and dy == 0:
+                start = positions + 1        # 자기 칸~오른쪽 칸에서 정렬 순서상 뒤에 있는 공만
+            else:
+                start = np.searchsorted(_target_keys, row + low, "left")
+
+            counts = np.maximum(end - start, 0)
+            total = counts.sum()
+
+            if total == 0:
+                continue
+
+            # i 번째 공의 후보 j 들은 start[i] ~ end[i] 구간, 이 구간들을 이어 붙인 목록 만들기
+            i = np.repeat(positions, counts)
+            first = np.repeat(start - (np.cumsum(counts) - counts), counts)
+            j = first + np.arange(total)
+            pairs_i.append(_idx[i])
+            pairs_j.append(_target_idx[j])
+
+        return pairs_i, pairs_j
+
+    def handle_ball_collision(self, _pairs=None):
+        """공-공 충돌 처리 (탄성충돌 물리 적용), 겹친 쌍들을 묶음(batch)으로 나눠서 묶음마다 한 번에 계산
+
+        서로 닿은 쌍 (i, j) 를 반환 (잠들 섬을 찾을 때 사용)
+        """
+        i, j = self.find_pairs() if _pairs is None else _pairs
+
+        # 두 공 사이의 거리 벡터
+        d = self.pos[j] - self.pos[i]
+        dist2 = np.einsum("ij,ij->i", d, d)
+        r_sum = self.r[i] + self.r[j]
+
+        # 충돌 감지: 두 공의 반지름 합보다 거리가 작으면 충돌
+        hit = (dist2 < r_sum * r_sum) & (dist2 > 0)
+        i, j = i[hit], j[hit]
+
+        if self.sleep:
+            self.wake_on_impact(i, j, d[hit] / np.sqrt(dist2[hit])[:, None])
+
+        for batch_i, batch_j in self.batches(i, j):
+            self.resolve_collision(batch_i, batch_j)
+
+        return i, j
+
+    def batches(self, _i, _j):
+        """한 묶음 안에서는 같은 공이 두 번 나오지 않도록 쌍들을 나누기
+
+        한 공이 여러 쌍에 나오는데 모든 쌍을 동시에 계산하면, 각 쌍이 옛날 속도를 보고 계산한 임펄스가 겹쳐서
+        에너지가 생기거나 사라짐. 공이 겹치지 않는 쌍끼리만 묶으면 묶음 안은 동시에 계산해도
+        하나씩 계산한 것과 똑같고, 다음 묶음은 앞 묶음이 바꾼 속도를 보고 계산함
+        - 쌍마다 무작위 번호를 주고, 양쪽 공에 닿은 쌍들 중 번호가 가장 작은 쌍만 이번 묶음에 넣음
+        - 한 공에 닿은 쌍은 많아야 몇 개라서 몇 번만 반복하면 모든 쌍이 처리됨
+        """
+        if len(_i) == 0:
+            return
+
+        smallest = np.empty(len(self.r), dtype=np.int64)
+
+        while len(_i):
+            m = len(_i)
+            ticket = self.rng.permutation(m)
+            smallest[_i] = m
+            smallest[_j] = m
+            np.minimum.at(smallest, _i, ticket) # 각 공에 닿은 쌍 중 가장 작은 번호
+            np.minimum.at(smallest, _j, ticket)
+            take = (smallest[_i] == ticket) & (smallest[_j] == ticket)
+
+            yield _i[take], _j[take]
+
+            _i, _j = _i[~take], _j[~take]
+
+    def resolve_collision(self, _i, _j):
+        """쌍 (_i[k], _j[k]) 들을 떼어내고 충돌 임펄스를 적용, 같은 공이 두 번 나오지 않아야 함 (batches)
+
+        잠든 공은 질량이 무한대인 것처럼(1/m = 0) 계산해서 움직이지 않음
+        """
+        d = self.pos[_j] - self.pos[_i]
+        distance = np.sqrt(np.einsum("ij,ij->i", d, d))
+        valid = distance > 0 # 앞 묶음에서 밀려나며 정확히 겹친 경우는 방향을 알 수 없어서 건너뜀
+        _i, _j, d, distance = _i[valid], _j[valid], d[valid], distance[valid]
+        normal = d / distance[:, None] # 충돌 방향의 단위벡터 (Normal vector)
+        awake_i, awake_j = self.awake[_i], self.awake[_j]
+
+        # 공들이 겹친 만큼 분리 (Separation), 앞 묶음에서 이미 떨어졌으면 0
+        # 둘 다 깨어있으면 반씩, 한쪽이 잠들어 있으면 깨어있는 공이 전부 움직임
+        overlap = np.maximum(self.r[_i] + self.r[_j] - distance, 0)
+        share_i = awake_i / np.maximum(awake_i.astype(np.float64) + awake_j, 1)
+        self.pos[_i] -= normal * (overlap * share_i)[:, None]
+        self.pos[_j] += normal * (overlap * (1 - share_i))[:, None]
+
+        # 충돌 방향의 상대 속도, 이미 멀어지고 있는 쌍(dvn > 0)은 임펄스 0
+        dvn = np.einsum("ij,ij->i", self.vel[_j] - self.vel[_i], normal)
+        inv_m1 = np.where(awake_i, 1 / self.m[_i], 0.0)
+        inv_m2 = np.where(awake_j, 1 / self.m[_j], 0.0)
+
+        # 충돌 임펄스 계산 (Impulse): J = -(1 + e) * dvn / (1/m1 + 1/m2)
+        impulse = np.where(dvn < 0, -(1 + self.elasticity) * dvn / (inv_m1 + inv_m2), 0.0)
+
+        # 속도 변경 (v = v + J/m)
+        self.vel[_i] -= normal * (impulse * inv_m1)[:, None]
+        self.vel[_j] += normal * (impulse * inv_m2)[:, None]
+
+    def wake_on_impact(self, _i, _j, _normal):
+        """깨어있는 공이 잠든 공에 SLEEP_SPEED 보다 빠르게 다가오면 잠든 공의 섬을 깨우기"""
+        one_asleep = self.awake[_i] != self.awake[_j]
+
+        if not one_asleep.any():
+            return
+
+        dvn = np.einsum("ij,ij->i", self.vel[_j[one_asleep]] - self.vel[_i[one_asleep]], _normal[one_asleep])
+        fast = -dvn > self.SLEEP_SPEED
+
+        if fast.any():
+            self.wake(np.concatenate((_i[one_asleep][fast], _j[one_asleep][fast])))
+
+    def wake(self, _idx):
+        """공 _idx 들과 같은 섬의 공들을 모두 깨우기 (드래그, 빠른 충돌, 화면 크기 변경)"""
+        asleep = np.asarray(_idx)[~self.awake[_idx]]
+
+        if len(asleep) == 0:
+            return
+
+        woken = np.zeros(len(self.r), dtype=bool) # 깨울 섬의 대표 번호들
+        woken[self.island[asleep]] = True
+        members = woken[self.island] & ~self.awake
+        self.awake[members] = True
+        self.still_time[members] = 0
+        self.island[members] = np.flatnonzero(members)
+
+        # 깨어난 공만 잠든 공들의 정렬된 키에서 빼기, 남은 순서는 그대로라 다시 정렬하지 않음
+        keys, idx = self.sleeping_grid
+        keep = ~members[idx]
+        self.sleeping_grid = keys[keep], idx[keep]
+        self.awake_changed()
+
+    def fall_asleep(self, _idx):
+        """공 _idx 들을 재우고, 새로 잠든 공들의 키만 정렬해서 잠든 공들의 정렬된 키 사이에 끼워 넣기"""
+        self.awake[_idx] = False
+        self.vel[_idx] = 0
+        self.prev_pos[_idx] = self.pos[_idx] # 잠든 공은 보간하지 않음
+
+        keys, idx = self.sleeping_grid
+        new_keys, new_idx = self.grid(_idx)
+        at = np.searchsorted(keys, new_keys)
+        self.sleeping_grid = np.insert(keys, at, new_keys), np.insert(idx, at, new_idx)
+        self.awake_changed()
+
+    def awake_changed(self):
+        self.active = slice(None) if self.awake.all() else np.flatnonzero(self.awake)
+
+    def update_sleep(self, _dt, _contacts):
+        """느린 상태가 SLEEP_TIME 초 넘게 이어진 공을 섬 단위로 재우기
+
+        섬 = 서로 닿아있는 공들을 이은 연결 요소 (Union-Find 를 배열 연산으로: 번호가 작은 쪽으로 합치기를 반복)
+        이미 잠든 섬에 닿아있는 공은 그 섬과 합쳐져서, 나중에 깨어날 때 같이 깨어남
+        """
+        if not self.sleep:
+            return
+
+        if self.awake_count() == 0:
+            return
+
+        moving = self.moving() # 잠든 공의 still_time 도 같이 늘어나지만 깨어날 때 0 으로 돌아감
+        speed2 = np.einsum("ij,ij->i", self.vel[moving], self.vel[moving])
+        slow = speed2 < self.SLEEP_SPEED * self.SLEEP_SPEED
+        self.still_time[moving] = np.where(slow, self.still_time[moving] + _dt, 0.0)
+        self.since_check += _dt
+
+        if self.since_check < self.SLEEP_CHECK:
+            return
+
+        self.since_check = 0.0
+
+        # ok = 잠든 공 + 잠들 준비가 된(ready) 깨어있는 공
+        ok = ~self.awake
+        ok[moving] |= self.still_time[moving] >= self.SLEEP_TIME
+
+        if not (ok & self.awake).any():
+            return
+
+        # ready 가 아닌 깨어있는 공(blocked)과 닿은 공은 그 공과 같은 섬이라 못 잠듦
+        # 그래서 합치기는 ready 인 공과 잠든 공 사이의 쌍만으로 하고, blocked 인 공의 섬은 나중에 빼면 됨
+        i, j = _contacts
+        blocked = ~ok
+        both = ok[i] & ok[j]
+        blocked[i[~both]] = True
+        blocked[j[~both]] = True
+
+        if not (self.awake & ~blocked).any(): # 잠들 수 있는 공이 하나도 없음
+            return
+
+        # 잠든 공은 자기 섬의 대표 번호에서, 깨어있는 공은 자기 번호에서 시작해서 닿은 쌍마다 작은 번호로 합침
+        i, j = i[both], j[both]
+        parent = np.where(self.awake, np.arange(len(self.r)), self.island)
+
+        while True:
+            low = np.minimum(parent[i], parent[j])
+            np.minimum.at(parent, parent[i], low)
+            np.minimum.at(parent, parent[j], low)
+
+            while True: # 대표 번호를 끝까지 따라가기 (경로 압축)
+                root = parent[parent]
+
+                if np.array_equal(root, parent):
+                    break
+
+                parent = root
+
+            if np.array_equal(parent[i], parent[j]):
+                break
+
+        # 섬 안에 blocked 인 공이 없는 섬만 재움
+        not_ready = np.zeros(len(self.r), dtype=bool)
+        not_ready[parent[blocked]] = True
+        good = ~not_ready[parent]
+        sleepers = np.flatnonzero(self.awake & good)
+
+        if len(sleepers) == 0:
+            return
+
+        # 이번에 잠드는 섬에 합쳐진 잠든 공들도 새 대표 번호로 (대표 번호 = 섬에서 가장 작은 공 번호)
+        merged = ~self.awake & good
+        self.island[merged] = parent[merged]
+        self.island[sleepers] = parent[sleepers]
+
+        self.fall_asleep(sleepers)
+
+
+class Snapshot:
+    """워커가 화면 쪽에 넘겨주는 상태 사본, 만든 뒤에는 바뀌지 않음 (읽기 전용 배열)
+
+    - prev_pos, pos: 마지막 두 물리 상태
+    - time: pos 가 나타내는 시각 (perf_counter), None 이면 멈춘 상태라 보간하지 않음
+    """
+    def __init__(self, _prev_pos, _pos, _r, _time, _step):
+        self.prev_pos = _prev_pos
+        self.pos = _pos
+        self.r = _r
+        self.time = _time
+        self.step = _step
+
+        for array in (self.prev_pos, self.pos):
+            array.flags.writeable = False
+
+    def interpolate(self, _now):
+        """_now 시각에 그릴 위치 (새 배열), 마지막 두 상태 사이를 흐른 시간만큼 보간"""
+        if self.time is None:
+            return self.pos.copy()
+
+        alpha = min(max((_now - self.time) / self.step, 0.0), 1.0)
+
+        return self.prev_pos + (self.pos - self.prev_pos) * alpha
+
+    def settled(self, _now):
+        """_now 이후로는 그릴 위치가 더 바뀌지 않는지 (보간이 끝났는지)"""
+        return self.time is None or _now - self.time >= self.step
+
+    def hit_test(self, _x, _y):
+        """(_x, _y) 를 포함하는 공의 번호, 없으면 None"""
+        d2 = (self.pos[:, 0] - _x) ** 2 + (self.pos[:, 1] - _y) ** 2
+        inside = np.flatnonzero(d2 <= self.r * self.r)
+
+        return int(inside[0]) if len(inside) else None
+
+
+class PhysicsWorker(QThread):
+    """물리 계산을 GUI 스레드와 따로 돌리는 스레드
+
+    물리와 그리기가 같은 이벤트 루프를 쓰면, 계산이 무거울 때 마우스 이벤트도 같이 밀림
+    - world 는 이 스레드만 건드림 (뒤쪽 버퍼), 화면 쪽은 publish 된 Snapshot 만 읽음 (앞쪽 버퍼)
+    - snapshot 은 참조 하나를 통째로 바꿔 끼우므로 읽는 쪽은 락 없이 항상 완성된 상태를 봄
+    - 화면 쪽 입력(드래그 등)은 deque 에 넣기만 하고, 워커가 스텝 사이에 꺼내서 적용
+      (deque 의 append / popleft 는 스레드 안전해서 락이 필요 없음)
+    """
+    def __init__(self, _world, _clock, _width, _height, _substeps=1):
+        super().__init__()
+        self.world = _world
+        self.clock = _clock
+        self.width = _width
+        self.height = _height
+        self.substeps = _substeps
+        self.inputs = deque()
+        self.dragging = None # 드래그 중인 공의 번호, 드래그 중에는 물리 시뮬레이션 멈춤
+        self.hidden = False  # 창이 안 보이면 계산하지 않음
+        self.snapshot = None
+        self.publish()
+
+    def send(self, *_command):
+        """화면 쪽에서 부름: ("move", 번호, x, y) 같은 명령을 워커에 전달"""
+        self.inputs.append(_command)
+
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            changed = self.apply_inputs()
+
+            if self.dragging is not None or self.hidden:
+                self.clock.pause() # 멈춘 시간만큼 나중에 몰아서 계산하지 않도록
+                steps = 0
+            else:
+                steps = self.clock.tick() # 지난번 이후 실제로 흐른 시간만큼의 스텝 수
+
+            moving = self.world.awake_count()
+
+            for _ in range(steps):        # 위치 업데이트, 벽 충돌, 공-공 충돌을 배열 연산으로
+                self.world.advance(self.clock.step, self.width, self.height, self.substeps)
+
+            if changed or (steps and (moving or self.world.awake_count())): # 모두 잠들어 있으면 발행할 것도 없음
+                self.publish()
+
+            # 다음 스텝 시각까지 쉬기 (바쁜 대기로 CPU 를 쓰지 않음)
+            time.sleep(max(self.clock.step - self.clock.accumulator, 0.001))
+
+    def apply_inputs(self):
+        """쌓인 입력을 모두 적용, 하나라도 있었으면 True"""
+        changed = False
+
+        while self.inputs:
+            name, *args = self.inputs.popleft()
+            changed = True
+
+            if name == "grab":      # 잡은 공(과 같은 섬)을 깨우고, 잡는 순간 공의 속도 0으로
+                self.dragging = args[0]
+                self.world.wake([self.dragging])
+                self.world.vel[self.dragging] = (0, 0)
+            elif name == "move":    # 보간하지 않고 커서 위치 그대로 그리도록 prev_pos 도 같이
+                idx, x, y = args
+                self.world.pos[idx] = (x, y)
+                self.world.prev_pos[idx] = (x, y)
+            elif name == "release": # 드래그 속도를 공의 속도로
+                idx, vx, vy = args
+                self.world.vel[idx] = (vx, vy)
+                self.dragging = None
+            elif name == "resize":
+                self.width, self.height = args
+            elif name == "hide":
+                self.hidden = True
+            elif name == "show":
+                self.hidden = False
+
+        return changed
+
+    def publish(self):
+        """지금 상태의 사본을 만들어서 snapshot 을 바꿔 끼우기"""
+        clock = self.clock
+        state_time = None if clock.last is None else clock.last - clock.accumulator
+        self.snapshot = Snapshot(
+            self.world.prev_pos.copy(), self.world.pos.copy(), self.world.r, state_time, clock.step
+        )
+
+
+def ball_gray(_r):
+    """공의 크기에 따라 색상 변경 (시각적 효과), 큰 공일수록 진한 회색"""
+    return np.maximum((200 - np.asarray(_r) * 3).astype(np.int64), 0)
+
+
+class SpriteCache:
+    """미리 그려둔 공 그림(sprite)들을 한 장의 그림(atlas)에 모아둔 캐시, 반지름과 색으로 찾음
+
+    공마다 QColor, QBrush 를 만들고 안티앨리어싱된 원을 하나씩 그리면 공이 많을 때 그리기가 제일 느림
+    반지름과 색이 같은 공은 모양도 같으므로 한 번만 그려두고, 모든 공을 drawPixmapFragments 한 번으로 복사
+    - 반지름은 1/STEPS px 단위로 맞춰서 종류를 줄임 (눈으로는 차이 없음)
+    - 처음 보는 종류가 나오거나 화면 배율(devicePixelRatio)이 바뀌면 atlas 를 다시 만듦
+    """
+    STEPS = 4
+
+    def __init__(self):
+        self.keys = {}  # (반지름, 회색 값) -> atlas 안의 칸 번호
+        self.dpr = 1.0
+        self.cell = 0
+        self.columns = 1
+        self.atlas = QPixmap()
+
+    def source_rects(self, _r, _dpr):
+        """공마다 atlas 에서 복사해올 영역 (left, top, width, height) 의 (n, 4) 배열"""
+        radius = np.round(np.asarray(_r) * self.STEPS) / self.STEPS
+        kinds, index = np.unique(np.column_stack((radius, ball_gray(_r))), axis=0, return_inverse=True)
+        kinds = [(float(r), int(gray)) for r, gray in kinds]
+
+        if _dpr != self.dpr or any(kind not in self.keys for kind in kinds):
+            self.build(set(self.keys) | set(kinds), _dpr)
+
+        rects = np.array([self.rect(self.keys[kind], kind[0]) for kind in kinds], dtype=np.float64)
+
+        return rects[index.reshape(-1)]
+
+    def build(self, _kinds, _dpr):
+        """모든 종류의 공을 화면 픽셀 크기로 한 장에 그리기"""
+        self.keys = {kind: i for i, kind in enumerate(sorted(_kinds))}
+        self.dpr = _dpr
+        self.cell = math.ceil(2 * max(r for r, _ in _kinds) * _dpr) + 2 # 안티앨리어싱된 가장자리를 위한 여유
+        self.columns = math.ceil(math.sqrt(len(_kinds)))
+        rows = math.ceil(len(_kinds) / self.columns)
+
+        image = QImage(self.columns * self.cell, rows * self.cell, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        painter.setPen(Qt.PenStyle.NoPen)
+
+        for (r, gray), i in self.keys.items():
+            x, y = self.center(i)
+            painter.setBrush(QColor(gray, gray, gray))
+            painter.drawEllipse(QPointF(x, y), r * _dpr, r * _dpr)
+
+        painter.end()
+        self.atlas = QPixmap.fromImage(image)
+
+    def center(self, _i):
+        return (_i % self.columns + 0.5) * self.cell, (_i // self.columns + 0.5) * self.cell
+
+    def rect(self, _i, _r):
+        x, y = self.center(_i)
+        half = _r * self.dpr + 1
+
+        return x - half, y - half, 2 * half, 2 * half
 
-    def update_position(self, _dt):
-        """시간(_dt)만큼 공의 위치를 업데이트"""
-        self.pos += self.vel * _dt
 
 # QWidget을 상속받아 QWidget내에 들어있는 것들도 사용가능.
 # 클래스명에 괄호 () 를 쓰면 상속받을 클래스 지정 가능.
 # 클래스명은 자유롭게 지정가능!
 class MyWidget(QWidget):
     # __init__ 은 클래스의 생성자. 이 경우에는 MyWidget의 초기화를 담당.
-    def __init__(self):
+    def __init__(self, _count=0, _hz=60, _substeps=1, _max_steps=5):
         # QWidget 클래스를 초기화함
         super().__init__()
         self.setWindowTitle("PyQT 수업2 Hard")
@@ -39,119 +696,102 @@ class MyWidget(QWidget):
         p.setColor(self.backgroundRole(), Qt.GlobalColor.white)
         self.setPalette(p)
 
-        self.balls = [                       # Ball()을 할때마다 Ball의 __init__이 불러짐
+        balls = [                              # Ball()을 할때마다 Ball의 __init__이 불러짐
             Ball(20, (150, 150), (100, 1)),    # 속도: 오른쪽 + 아래
             Ball(25, (400, 200), (-1, 200)),   # 속도: 왼쪽 + 아래
             Ball(30, (300, 400), (1.5, -100)), # 속도: 오른쪽 + 위
         ]
+
+        self.elasticity = 0.95  # 탄성 계수 e, 0.95의 경우 조금씩 에너지를 손실.
+
+        if _count:                           # 공 개수를 정해주면 작은 공들로 채움
+            world = BallWorld.random(_count, self.width(), self.height(), self.elasticity, _sleep=True)
+        else:                                # 공들의 상태는 모두 world 의 배열에
+            world = BallWorld.from_balls(balls, self.elasticity, _sleep=True)
+
+        # 물리는 항상 1/_hz 초씩 진행, 한 스텝을 _substeps 번으로 나눠서 계산 (빠른 공 터널링 방지)
+        # world 는 워커 스레드만 건드리고, 여기서는 worker.snapshot 만 읽음
+        self.worker = PhysicsWorker(world, FixedStep(1 / _hz, _max_steps), self.width(), self.height(), _substeps)
+
         self.drag_idx = None
         self.drag_offset = QPointF()
+        self.drag_pos = QPointF()            # 드래그 중인 공을 그릴 위치 (워커를 기다리지 않고 바로 그림)
         self.last_mouse_pos = QPointF()      # 마지막 마우스 위치 저장
-        self.drag_velocity = QPointF(0, 0)   # 드래그 속도 저장        
-        self.elasticity = 0.95  # 탄성 계수 e, 0.95의 경우 조금씩 에너지를 손실.
+        self.drag_velocity = QPointF(0, 0)   # 드래그 속도 저장
+
+        self.sprites = SpriteCache()
+        self.fragments = None       # 공마다 그릴 위치와 atlas 영역 (QPainter.PixmapFragment 배열)
+        self.fragment_view = None   # 같은 메모리를 NumPy (n, 10) 배열로 본 것, 프레임마다 위치만 바꿔 씀
+        self.fragment_source = None # fragments 를 만들 때 쓴 (반지름 배열, 화면 배율)
+        self.painted = None         # 마지막으로 그린 snapshot
 
         self.timer = QTimer()
-        self.timer.timeout.connect(self.physics_update)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.frame) # 화면 다시 그리기만, 물리는 워커 스레드에서
         self.timer.start(16) # 타이머 설정: 16ms마다 업데이트 (약 60 FPS)
 
-    def physics_update(self):
-        """물리 시뮬레이션 업데이트 코드"""
-        if self.drag_idx is not None: # 드래그 중에는 물리 시뮬레이션 멈춤
-            return                    # 이와 같이 코드가 실행되기 전에 if로 체크하는걸 "이른 반환(Early Return)" 이라함!
-
-        dt = 0.016  # 시간 간격 (약 60 FPS)
-
-        for ball in self.balls:      # in 키워드를 활용하면 배열안의 오브젝트들을 하나씩 꺼낼수 있음!   
-            ball.update_position(dt) # 1. 모든 공의 위치 업데이트
-
-        self.handle_wall_collision() # 2. 벽 충돌 처리
-        self.handle_ball_collision() # 3. 공-공 충돌 처리
-        self.update()                # 4. 화면 다시 그리기
-
-    def handle_wall_collision(self):
-        """벽과의 충돌 처리"""
-        width = self.width()
-        height = self.height()
-
-        for ball in self.balls:
-            # 왼쪽 벽
-            if ball.pos.x() - ball.r < 0:
-                ball.pos.setX(ball.r)
-                ball.vel.setX(-ball.vel.x() * self.elasticity)
-
-            # 오른쪽 벽
-            if ball.pos.x() + ball.r > width:
-                ball.pos.setX(width - ball.r)
-                ball.vel.setX(-ball.vel.x() * self.elasticity)
-
-            # 위쪽 벽
-            if ball.pos.y() - ball.r < 0:
-                ball.pos.setY(ball.r)
-                ball.vel.setY(-ball.vel.y() * self.elasticity)
-
-            # 아래쪽 벽
-            if ball.pos.y() + ball.r > height:
-                ball.pos.setY(height - ball.r)
-                ball.vel.setY(-ball.vel.y() * self.elasticity)
-
-    def handle_ball_collision(self):
-        """공-공 충돌 처리 (탄성충돌 물리 적용)"""
-        n = len(self.balls)
-
-        for i in range(n):
-            for j in range(i + 1, n):
-                ball1 = self.balls[i]
-                ball2 = self.balls[j]
-
-                # 두 공 사이의 거리 벡터
-                dx = ball2.pos.x() - ball1.pos.x()
-                dy = ball2.pos.y() - ball1.pos.y()
-                distance = (dx * dx + dy * dy) ** 0.5 # 유클리드 거리(Euclidean Distance)
-
-                # 충돌 감지: 두 공의 반지름 합보다 거리가 작으면 충돌
-                if (distance < (ball1.r + ball2.r)) and (0 < distance):
-                    # 충돌 방향의 단위벡터 (Normal vector)
-                    nx = dx / distance
-                    ny = dy / distance
-
-                    # 공들이 겹친 만큼 분리 (Separation)
-                    overlap = (ball1.r + ball2.r) - distance
-                    ball1.pos.setX(ball1.pos.x() - nx * overlap * 0.5)
-                    ball1.pos.setY(ball1.pos.y() - ny * overlap * 0.5)
-                    ball2.pos.setX(ball2.pos.x() + nx * overlap * 0.5)
-                    ball2.pos.setY(ball2.pos.y() + ny * overlap * 0.5)
-
-                    # 충돌 방향의 상대 속도
-                    dvx = ball2.vel.x() - ball1.vel.x()
-                    dvy = ball2.vel.y() - ball1.vel.y()
-                    dvn = dvx * nx + dvy * ny
-
-                    # 이미 멀어지고 있으면 충돌 처리 안함
-                    if dvn > 0:
-                        continue
-
-                    # 충돌 임펄스 계산 (Impulse)
-                    # 공의 에너지 J = -(1 + e) * dvn / (1/m1 + 1/m2)
-                    impulse = -(1 + self.elasticity) * dvn / (1 / ball1.m + 1 / ball2.m)
-
-                    # 속도 변경 (F = ma, v = v + a*dt, a = F/m)
-                    ball1.vel.setX(ball1.vel.x() - impulse * nx / ball1.m)
-                    ball1.vel.setY(ball1.vel.y() - impulse * ny / ball1.m)
-                    ball2.vel.setX(ball2.vel.x() + impulse * nx / ball2.m)
-                    ball2.vel.setY(ball2.vel.y() + impulse * ny / ball2.m)
+    def frame(self):
+        """snapshot 이 바뀌었거나 아직 보간 중일 때만 다시 그리기 (모두 잠들면 그리기도 쉼)"""
+        snapshot = self.worker.snapshot
+
+        if snapshot is not self.painted or not snapshot.settled(time.perf_counter()):
+            self.update()
+
+    def showEvent(self, _e):
+        if not self.worker.isRunning():
+            self.worker.start()
+
+        self.worker.send("show")
+        self.timer.start()
+
+    def hideEvent(self, _e):
+        """창이 안 보이면(최소화 등) 그리기도 물리도 멈춰서 쓸데없는 계산을 하지 않음"""
+        self.timer.stop()
+        self.worker.send("hide")
+
+    def closeEvent(self, _e):
+        self.worker.stop()
+
+    def resizeEvent(self, _e):
+        self.worker.send("resize", self.width(), self.height())
 
     def paintEvent(self, _e):
-        """공을 그리기"""
+        """공을 그리기, 워커가 마지막으로 발행한 snapshot 만 읽음"""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-        painter.setPen(Qt.PenStyle.NoPen)
+        snapshot = self.worker.snapshot
+        self.painted = snapshot
+
+        # 마지막 두 물리 상태 사이를 보간해서, 화면 갱신 주기와 물리 주기가 달라도 부드럽게 움직임
+        pos = snapshot.interpolate(time.perf_counter())
+
+        if self.drag_idx is not None:
+            pos[self.drag_idx] = (self.drag_pos.x(), self.drag_pos.y())
 
-        for ball in self.balls:
-            # 공의 크기에 따라 색상 변경 (시각적 효과)
-            gray_value = int(200 - ball.r * 3)
-            ball_color = QColor(gray_value, gray_value, gray_value)
-            painter.setBrush(QBrush(ball_color))
-            painter.drawEllipse(ball.pos, ball.r, ball.r)
+        self.draw_balls(painter, pos, snapshot.r)
+
+    def draw_balls(self, _painter, _pos, _r):
+        """미리 그려둔 공 그림(SpriteCache)을 drawPixmapFragments 한 번으로 모두 그리기"""
+        n = len(_pos)
+
+        if n == 0:
+            return
+
+        dpr = _painter.device().devicePixelRatioF()
+        source = self.fragment_source
+
+        if source is None or source[0] is not _r or source[1] != dpr:
+            # PixmapFragment 는 실수 10개 (x, y, sourceLeft, sourceTop, width, height, scaleX, scaleY, rotation, opacity)
+            # 공을 추가하거나 배율이 바뀔 때만 새로 만들고, 위치 말고는 그대로 다시 씀
+            self.fragments = sip.array(QPainter.PixmapFragment, n)
+            self.fragment_view = np.frombuffer(memoryview(self.fragments), dtype=np.float64).reshape(n, 10)
+            self.fragment_view[:, 2:6] = self.sprites.source_rects(_r, dpr)
+            self.fragment_view[:, 6:8] = 1 / dpr # atlas 는 화면 픽셀 크기로 그려져 있음
+            self.fragment_view[:, 8] = 0
+            self.fragment_view[:, 9] = 1
+            self.fragment_source = (_r, dpr)
+
+        self.fragment_view[:, 0:2] = _pos # 조각의 중심 = 공의 중심
+        _painter.drawPixmapFragments(self.fragments, self.sprites.atlas)
 
     def mouseMoveEvent(self, _e: QMouseEvent):
         """마우스 드래그 시 공 이동"""
@@ -159,12 +799,12 @@ class MyWidget(QWidget):
             return
 
         cursor = _e.position()
-        ball = self.balls[self.drag_idx]
 
         if self.last_mouse_pos.x() != 0 or self.last_mouse_pos.y() != 0: # 현재 위치와 이전 위치의 차이로 속도 계산
             self.drag_velocity = (cursor - self.last_mouse_pos) * 3      # 마우스 이동 속도 = (현재 위치 - 이전 위치) * 속도 배율
 
-        ball.pos = cursor - self.drag_offset # 공의 위치 업데이트
+        self.drag_pos = cursor - self.drag_offset
+        self.worker.send("move", self.drag_idx, self.drag_pos.x(), self.drag_pos.y()) # 공의 위치 업데이트
 
         self.last_mouse_pos = cursor # 이전 마우스 위치 저장 (다음 프레임에서 사용)
         self.update()
@@ -175,23 +815,24 @@ class MyWidget(QWidget):
             return
 
         cursor = _e.position()
-
-        for idx, ball in enumerate(self.balls):
-            if ball.contains(cursor):
-                self.drag_idx = idx
-                self.drag_offset = cursor - ball.pos
-                self.last_mouse_pos = cursor          # 마우스 위치 초기화
-                self.drag_velocity = QPointF(0, 0)    # 드래그 속도 초기화
-                ball.vel = QPointF(0, 0)              # 잡는 순간 공의 속도 0으로
-
-                break
+        snapshot = self.worker.snapshot
+        idx = snapshot.hit_test(cursor.x(), cursor.y())
+
+        if idx is not None:
+            x, y = snapshot.pos[idx]
+            self.drag_idx = idx
+            self.drag_pos = QPointF(x, y)
+            self.drag_offset = cursor - self.drag_pos
+            self.last_mouse_pos = cursor          # 마우스 위치 초기화
+            self.drag_velocity = QPointF(0, 0)    # 드래그 속도 초기화
+            self.worker.send("grab", idx)         # 잡는 순간 공의 속도 0으로
 
     def mouseReleaseEvent(self, _e: QMouseEvent):
         """마우스를 놓으면 공 놓기 + 드래그 속도 적용"""
         if _e.button() == Qt.MouseButton.LeftButton:
-            if self.drag_idx is not None:
-                self.balls[self.drag_idx].vel = self.drag_velocity # 공을 놓을 때 드래그 속도를 공의 속도로 설정
-                
+            if self.drag_idx is not None: # 공을 놓을 때 드래그 속도를 공의 속도로 설정
+                self.worker.send("release", self.drag_idx, self.drag_velocity.x(), self.drag_velocity.y())
+
             self.drag_idx = None
             self.last_mouse_pos = QPointF()       # 마우스 위치 초기화
             self.drag_velocity = QPointF(0, 0)    # 드래그 속도 초기화
@@ -199,7 +840,9 @@ class MyWidget(QWidget):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MyWidget()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 0    # python 1-3.py 5000 -> 공 5000개
+    substeps = int(sys.argv[2]) if len(sys.argv) > 2 else 1 # python 1-3.py 5000 4 -> 한 스텝을 4번으로 나눠서
+    window = MyWidget(count, _substeps=substeps)
     window.show()
-    
-    sys.exit(app.exec())
\ No newline at end of file
+
+    sys.exit(app.exec())
@@ -0,0 +1,17 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def load_simulation():
+    """파일 이름이 숫자로 시작하고 - 가 있어서 import 문으로는 못 불러오기 때문에 직접 불러오기
+
+    BallWorld 는 Qt 창 없이 동작하므로 QApplication 을 만들지 않음
+    """
+    path = Path(__file__).with_name("1-3.py")
+    spec = importlib.util.spec_from_file_location("simulation", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["simulation"] = module
+    spec.loader.exec_module(module)
+
+    return module
@@ -0,0 +1,101 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+from bench_common import load_simulation
+
+
+def draw_ellipses(_painter, _pos, _r):
+    """이전 방식: 공마다 QColor, QBrush 를 만들고 안티앨리어싱된 원을 하나씩 그리기"""
+    from PyQt6.QtCore import QPointF, Qt
+    from PyQt6.QtGui import QBrush, QColor, QPainter
+
+    _painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+    _painter.setPen(Qt.PenStyle.NoPen)
+
+    for (x, y), r in zip(_pos.tolist(), _r.tolist()):
+        gray_value = max(int(200 - r * 3), 0)
+        ball_color = QColor(gray_value, gray_value, gray_value)
+        _painter.setBrush(QBrush(ball_color))
+        _painter.drawEllipse(QPointF(x, y), r, r)
+
+
+def paint_ms(_image, _draw, _frames: int) -> tuple[float, float]:
+    """(첫 프레임 ms, 그 뒤 프레임 평균 ms), 위젯의 paintEvent 처럼 프레임마다 QPainter 를 새로 만듦"""
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QPainter
+
+    times = []
+
+    for _ in range(_frames + 1):
+        _image.fill(Qt.GlobalColor.white)
+        start = time.perf_counter()
+        painter = QPainter(_image)
+        _draw(painter)
+        painter.end()
+        times.append(time.perf_counter() - start)
+
+    return times[0] * 1000, sum(times[1:]) / _frames * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="공 그리기(paintEvent) 한 프레임에 걸리는 시간 측정, 화면 대신 QImage 에 그림")
+    parser.add_argument("--sizes", default="1000,10000", help="공 수들")
+    parser.add_argument("--frames", type=int, default=50, help="공 수마다 그릴 프레임 수")
+    parser.add_argument("--density", type=float, default=0.3, help="공 면적의 합 / 화면 면적")
+    parser.add_argument("--dpr", type=float, default=1.0, help="화면 배율 (HiDPI 화면은 2)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="결과 JSON 을 저장할 파일")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen") # 창을 띄우지 않음
+    from PyQt6.QtGui import QImage
+    from PyQt6.QtWidgets import QApplication
+
+    sim = load_simulation()
+    app = QApplication(sys.argv[:1])
+    widget = sim.MyWidget() # 창을 띄우지 않으므로 물리 워커도 시작하지 않음
+    results = []
+
+    for n in [int(x) for x in args.sizes.split(",")]:
+        size = math.sqrt(n * math.pi * 13 / args.density) # bench_physics.py 와 같은 빽빽한 정도
+        world = sim.BallWorld.random(n, size, size, _seed=args.seed)
+        pos = world.pos
+
+        pixels = math.ceil(size * args.dpr)
+        image = QImage(pixels, pixels, QImage.Format.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(args.dpr)
+
+        result = {"balls": n, "box": round(size, 1), "dpr": args.dpr, "frames": args.frames, "paint": {}}
+        cases = {
+            "ellipses": lambda painter: draw_ellipses(painter, pos, world.r),
+            "sprites": lambda painter: widget.draw_balls(painter, pos, world.r),
+        }
+
+        for name, draw in cases.items():
+            first, mean = paint_ms(image, draw, args.frames)
+            result["paint"][name] = {"first_frame_ms": round(first, 3), "ms_per_frame": round(mean, 3)}
+
+        results.append(result)
+        print(
+            f"{n:>7} balls  ellipses {result['paint']['ellipses']['ms_per_frame']:>8} ms"
+            f"  sprites {result['paint']['sprites']['ms_per_frame']:>8} ms",
+            file=sys.stderr,
+        )
+
+    output = json.dumps(results, indent=2)
+
+    if args.out:
+        Path(args.out).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
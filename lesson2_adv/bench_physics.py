@@ -0,0 +1,93 @@
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bench_common import load_simulation
+
+
+def run(
+    _sim, _n: int, _steps: int, _dt: float, _elasticity: float, _density: float, _seed: int, _sleep: bool, _moving: float
+) -> dict:
+    # 공 수가 달라도 빽빽한 정도(공 면적 / 화면 면적)가 같도록 화면 크기를 정함
+    mean_area = math.pi * 13  # 반지름 2~5 균등분포일 때 r² 의 평균은 13
+    size = math.sqrt(_n * mean_area / _density)
+    world = _sim.BallWorld.random(_n, size, size, _elasticity, _seed, _sleep)
+
+    if _moving < 1:
+        # 거의 멈춘 장면: _moving 비율의 공만 원래 속도, 나머지는 잠들 만큼 느리게
+        rng = np.random.default_rng(_seed)
+        slow = rng.random(_n) >= _moving
+        world.vel[slow] = rng.uniform(-1, 1, (int(slow.sum()), 2))
+
+    warmup = math.ceil((world.SLEEP_TIME + world.SLEEP_CHECK) / _dt) + 1 if _sleep else 1
+
+    for _ in range(warmup):  # 첫 스텝은 메모리 할당 등이 섞여 있어서 측정에서 뺌, 잠자기를 켜면 느린 공이 잠들 때까지
+        world.step(_dt, size, size)
+
+    awake_start = world.awake_count()
+    world.phase_time = dict.fromkeys(world.phase_time, 0.0)
+    energy_start = world.kinetic_energy()
+
+    start = time.perf_counter()
+
+    for _ in range(_steps):
+        world.step(_dt, size, size)
+
+    elapsed = time.perf_counter() - start
+    energy_end = world.kinetic_energy()
+
+    return {
+        "balls": _n,
+        "box": round(size, 1),
+        "steps": _steps,
+        "steps_per_sec": round(_steps / elapsed, 1),
+        "ms_per_step": round(elapsed / _steps * 1000, 3),
+        "phase_ms_per_step": {name: round(t / _steps * 1000, 3) for name, t in world.phase_time.items()},
+        "energy_start": energy_start,
+        "energy_end": energy_end,
+        "energy_drift": (energy_end - energy_start) / energy_start if energy_start else 0.0,
+        "awake_start": awake_start,
+        "awake_end": world.awake_count(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="공 물리 엔진(BallWorld)을 창 없이 돌려서 속도/에너지 변화 측정")
+    parser.add_argument("--sizes", default="100,1000,10000,100000", help="공 수들")
+    parser.add_argument("--steps", type=int, default=200, help="공 수마다 진행할 스텝 수")
+    parser.add_argument("--dt", type=float, default=0.016)
+    parser.add_argument("--elasticity", type=float, default=1.0, help="1.0 이면 에너지가 보존돼야 해서 drift 가 오차")
+    parser.add_argument("--density", type=float, default=0.3, help="공 면적의 합 / 화면 면적")
+    parser.add_argument("--sleep", action="store_true", help="느린 공 잠자기 켜기 (잠들 때 속도를 0 으로 해서 drift 가 생김)")
+    parser.add_argument("--moving", type=float, default=1.0, help="움직이는 공의 비율, 나머지는 거의 멈춘 상태로 시작")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="결과 JSON 을 저장할 파일")
+    args = parser.parse_args()
+
+    sim = load_simulation()
+    results = []
+
+    for n in [int(x) for x in args.sizes.split(",")]:
+        result = run(sim, n, args.steps, args.dt, args.elasticity, args.density, args.seed, args.sleep, args.moving)
+        results.append(result)
+        print(
+            f"{n:>7} balls {result['steps_per_sec']:>9} steps/s  drift {result['energy_drift']:+.2e}"
+            f"  awake {result['awake_end']}",
+            file=sys.stderr,
+        )
+
+    output = json.dumps(results, indent=2)
+
+    if args.out:
+        Path(args.out).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()